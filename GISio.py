@@ -2,15 +2,92 @@
 import warnings
 warnings.filterwarnings('ignore', category=UserWarning)
 import os
+import time
+import itertools
+import weakref
 from collections import OrderedDict
+from functools import partial, lru_cache
 import numpy as np
 import fiona
-from shapely.geometry import Point, shape, asLineString, mapping
-from shapely.wkt import loads
+from shapely.geometry import Point, LineString, shape, mapping
 import pandas as pd
 import shutil
 import numpy as np
 
+def _crs_key(crs):
+    """Normalize a coordinate reference system specification to a hashable key:
+    EPSG codes to 'EPSG:<code>', fiona crs dictionaries to proj4 strings,
+    and shapefiles or .prj files to (path of .prj file, modification time)."""
+    if isinstance(crs, (int, np.integer)):
+        return 'EPSG:{}'.format(int(crs))
+    if isinstance(crs, dict):
+        from fiona.crs import to_string
+        return to_string(crs)
+    if hasattr(crs, 'to_wkt'):  # pyproj CRS
+        return crs.to_wkt()
+    crs = str(crs).strip()
+    if crs.isdigit():
+        return 'EPSG:{}'.format(crs)
+    base, ext = os.path.splitext(crs)
+    if ext.lower() in ('.prj', '.shp', '.dbf'):
+        prjfile = os.path.abspath(base + '.prj')
+        if not os.path.exists(prjfile):
+            raise IOError('{} not found'.format(prjfile))
+        return prjfile, os.path.getmtime(prjfile)
+    return crs
+
+
+@lru_cache(maxsize=256)
+def _cached_crs(key):
+    from pyproj import CRS
+    if isinstance(key, tuple):
+        with open(key[0]) as src:
+            return CRS.from_user_input(src.read())
+    return CRS.from_user_input(key)
+
+
+@lru_cache(maxsize=256)
+def _cached_wkt(key, version='WKT1_ESRI', pretty=False):
+    return _cached_crs(key).to_wkt(version, pretty=pretty)
+
+
+@lru_cache(maxsize=256)
+def _cached_proj4(key):
+    return _cached_crs(key).to_proj4()
+
+
+def get_crs(crs):
+    """Get a pyproj CRS object for a coordinate reference system,
+    from the PROJ database installed with pyproj (without network access).
+    Results are memoized, so that repeated calls with the same
+    crs are free (see also get_wkt and get_proj4).
+
+    Parameters
+    ----------
+    crs : int, str, dict or pyproj CRS
+        EPSG code (e.g. 4269 or 'EPSG:4269'), proj4 string, WKT,
+        shapefile or .prj file, or crs dictionary (as read by fiona).
+
+    Returns
+    -------
+    crs : pyproj.CRS
+    """
+    return _cached_crs(_crs_key(crs))
+
+
+def get_wkt(crs, version='WKT1_ESRI', pretty=False):
+    """Get well-known text for a coordinate reference system (see get_crs).
+    By default, in the ESRI flavor used by .prj files."""
+    return _cached_wkt(_crs_key(crs), version, pretty)
+
+
+def write_prj(crs, prjfile):
+    """Write a .prj file (ESRI WKT) for a coordinate reference system (see get_crs)."""
+    with open(prjfile, 'w') as dest:
+        dest.write(get_wkt(crs))
+    print('wrote {}'.format(prjfile))
+
+
 def getPRJwkt(epsg):
    """
    from: https://code.google.com/p/pyshp/wiki/CreatePRJfiles
@@ -18,11 +95,126 @@ def getPRJwkt(epsg):
    Grabs a WKT version of an EPSG code
    usage getPRJwkt(4326)
 
-   This makes use of links like http://spatialreference.org/ref/epsg/4326/prettywkt/
+   The WKT comes from the local PROJ database (see get_crs),
+   instead of http://spatialreference.org/ref/epsg/4326/prettywkt/
    """
-   import urllib.request, urllib.parse, urllib.error
-   f=urllib.request.urlopen("http://spatialreference.org/ref/epsg/{0}/prettywkt/".format(epsg))
-   return (f.read())
+   return get_wkt(epsg, version='WKT1_GDAL', pretty=True)
+
+def _flatten_coords(coords):
+    """Yield the (x, y) pairs in nested GeoJSON coordinates (any depth)."""
+    if len(coords) > 0 and np.isscalar(coords[0]):
+        yield coords[:2]
+    else:
+        for c in coords:
+            for xy in _flatten_coords(c):
+                yield xy
+
+
+def _mapping_coords(geom):
+    """All (x, y) coordinates in a GeoJSON geometry mapping, as a list."""
+    if geom['type'] == 'GeometryCollection':
+        return [xy for g in geom['geometries'] for xy in _mapping_coords(g)]
+    return list(_flatten_coords(geom['coordinates']))
+
+
+def feature_bounds(geoms):
+    """Get the bounding box of each geometry in a sequence.
+
+    Parameters
+    ----------
+    geoms : sequence of shapely geometries, LazyGeometry objects,
+        GeoJSON geometry mappings, WKB bytes or None (any geometry type)
+
+    Returns
+    -------
+    bounds : 2D numpy array (n geometries, (xmin, ymin, xmax, ymax))
+        Null geometries have bounds of NaN.
+    """
+    geoms = list(geoms)
+    bounds = np.full((len(geoms), 4), np.nan)
+    # GeoJSON coordinates (including those of undecoded LazyGeometry objects)
+    # are all concatenated into one array, and reduced to the bounds
+    # of each feature in one pass
+    mappings = [i for i, g in enumerate(geoms) if _geojson_mapping(g) is not None]
+    if len(mappings) > 0:
+        coords = [_mapping_coords(_geojson_mapping(geoms[i])) for i in mappings]
+        counts = np.array([len(c) for c in coords])
+        has_coords = counts > 0
+        if has_coords.any():
+            xy = np.array([xy for c in coords for xy in c], dtype=float).reshape(-1, 2)
+            starts = np.append(0, np.cumsum(counts)[:-1])[has_coords]
+            rows = np.array(mappings)[has_coords]
+            bounds[rows, 0] = np.minimum.reduceat(xy[:, 0], starts)
+            bounds[rows, 1] = np.minimum.reduceat(xy[:, 1], starts)
+            bounds[rows, 2] = np.maximum.reduceat(xy[:, 0], starts)
+            bounds[rows, 3] = np.maximum.reduceat(xy[:, 1], starts)
+    # everything else is converted to shapely geometries,
+    # whose bounds are computed by GEOS
+    # (LazyGeometry objects are decoded without caching the shapely geometry)
+    others = np.array([i for i, g in enumerate(geoms) if g is not None
+                       and _geojson_mapping(g) is None], dtype=int)
+    if len(others) > 0:
+        shapes = decode_geometries([geoms[i] for i in others])
+        try:
+            from shapely import bounds as shapely_bounds
+            bounds[others] = shapely_bounds(shapes)
+        except ImportError:
+            bounds[others] = [g.bounds if not g.is_empty else (np.nan,) * 4
+                              for g in shapes]
+    return bounds
+
+
+def _geojson_mapping(geom):
+    """Return the GeoJSON mapping for a geometry mapping, or an undecoded
+    LazyGeometry that holds one; otherwise None."""
+    # (LazyGeometry is checked first, as hasattr would decode it)
+    if isinstance(geom, LazyGeometry):
+        if geom._geom is not None:
+            return None
+        geom = geom.data
+    if isinstance(geom, dict) or hasattr(geom, 'keys'):
+        return geom
+    return None
+
+
+def _total_bounds(bounds):
+    """Bounds of all features (xmin, ymin, xmax, ymax), from a 2D array
+    of feature bounds (see feature_bounds)."""
+    valid = ~np.isnan(bounds).any(axis=1)
+    if not valid.any():
+        return (np.nan,) * 4
+    bounds = bounds[valid]
+    return (bounds[:, 0].min(), bounds[:, 1].min(),
+            bounds[:, 2].max(), bounds[:, 3].max())
+
+
+# feature bounds for DataFrames (see get_feature_bounds);
+# entries are removed when the DataFrame is garbage collected
+_bounds_cache = {}
+
+
+def get_feature_bounds(indf, geo_column='geometry'):
+    """Get the bounding box of each feature in a DataFrame (see feature_bounds).
+    The bounds are cached for the DataFrame, and only recomputed if the
+    geometries in the geometry column change.
+
+    Returns
+    -------
+    bounds : 2D numpy array (n features, (xmin, ymin, xmax, ymax))
+    """
+    geoms = indf[geo_column].values
+    ids = np.array([id(g) for g in geoms], dtype=np.int64)
+    key = (id(indf), geo_column)
+    cached = _bounds_cache.get(key)
+    if cached is not None and np.array_equal(cached[0], ids):
+        return cached[2]
+    bounds = feature_bounds(geoms)
+    if key not in _bounds_cache:
+        weakref.finalize(indf, _bounds_cache.pop, key, None)
+    # keep references to the geometries, so that their ids stay valid
+    _bounds_cache[key] = (ids, geoms, bounds)
+    return bounds
+
 
 def get_df_bounds(indf, geo_column='geometry'):
     """
@@ -30,19 +222,7 @@ def get_df_bounds(indf, geo_column='geometry'):
     :param indf: dataframe that includes a geometry column
     :return: dfbounds: a tuple of (minx, miny, maxx, maxy) bounding all the geometry column members
     """
-    minx = np.inf
-    miny = np.inf
-    maxx = -np.inf
-    maxy = -np.inf
-    for cgeom in indf[geo_column]:
-        tmpbounds = cgeom.bounds
-
-        minx = np.min([minx, tmpbounds[0]])
-        miny = np.min([miny, tmpbounds[1]])
-        maxx = np.max([maxx, tmpbounds[2]])
-        maxy = np.max([maxy, tmpbounds[3]])
-
-    return (minx, miny, maxx, maxy)
+    return _total_bounds(get_feature_bounds(indf, geo_column))
 
 def get_proj4(prj):
     """Get proj4 string for a projection file
@@ -56,28 +236,306 @@ def get_proj4(prj):
     -------
     proj4 string (http://trac.osgeo.org/proj/)
 
+    Notes
+    -----
+    Results are cached for each file (until it is modified; see get_crs).
     """
-    from osgeo import osr
+    return _cached_proj4(_crs_key(prj[:-4] + '.prj')) # allows shp or prj to be argued
 
-    prjfile = prj[:-4] + '.prj' # allows shp or prj to be argued
-    prjtext = open(prjfile).read()
-    srs = osr.SpatialReference()
-    srs.ImportFromESRI([prjtext])
-    proj4 = srs.ExportToProj4()
-    return proj4
+def get_shapefile_bounds(shapefile, filter=None, layer=None):
+    """Get the bounds of all features in a shapefile (or other vector file).
 
-def get_shapefile_bounds(shapefile):
-    xmin, xmax = 0, 0
-    ymin, ymax = 0, 0
-    with fiona.open(shapefile) as src:
-        for rec in src:
-            for crds in rec['geometry']['coordinates']:
-                a = np.array(crds)
-                x, y = a[:, 0], a[:, 1]
-                xmin, xmax = np.min(x, xmin), np.max(x, xmax)
-                ymin, ymax = np.min(y, ymin), np.max(y, ymax)
+    Parameters
+    ----------
+    shapefile : str
+    filter : tuple (xmin, ymin, xmax, ymax), optional
+        Only include features that intersect filter (as with shp2df).
+        For shapefiles, candidate features are found with the spatial index
+        if it exists and is up to date (see load_spatial_index).
+        By default, the bounds are read from the file header, without reading any features.
+    layer : str, optional
+        Layer name (for files with multiple layers).
+
+    Returns
+    -------
+    xmin, xmax, ymin, ymax
+    """
+    sindex = None
+    if filter is not None and layer is None and _get_driver(shapefile) == 'ESRI Shapefile':
+        sindex = load_spatial_index(shapefile, build=False)
+    if filter is None:
+        with fiona.open(shapefile, layer=layer) as src:
+            xmin, ymin, xmax, ymax = src.bounds
+    elif sindex is not None:
+        fids, bounds = _spatial_index_fids(shapefile, sindex, filter)
+        xmin, ymin, xmax, ymax = _total_bounds(bounds)
+    else:
+        with fiona.open(shapefile, layer=layer) as src:
+            geoms = [rec['geometry'] for rec in src.filter(bbox=filter)]
+        xmin, ymin, xmax, ymax = _total_bounds(feature_bounds(geoms))
     return xmin, xmax, ymin, ymax
 
+
+def _hilbert_codes(x, y, extent, order=16):
+    """Position of points along a Hilbert curve covering extent
+    (xmin, ymin, xmax, ymax), on a 2**order x 2**order grid."""
+    n = 2**order
+    xmin, ymin, xmax, ymax = extent
+    xi = ((x - xmin) / max(xmax - xmin, 1e-300) * (n - 1)).astype(np.int64)
+    yi = ((y - ymin) / max(ymax - ymin, 1e-300) * (n - 1)).astype(np.int64)
+    codes = np.zeros(len(xi), dtype=np.int64)
+    s = n // 2
+    while s > 0:
+        rx = (xi & s) > 0
+        ry = (yi & s) > 0
+        codes += s * s * ((3 * rx.astype(np.int64)) ^ ry.astype(np.int64))
+        # rotate the quadrant
+        flip = ~ry & rx
+        xi[flip] = n - 1 - xi[flip]
+        yi[flip] = n - 1 - yi[flip]
+        swap = ~ry
+        xi[swap], yi[swap] = yi[swap], xi[swap]
+        s //= 2
+    return codes
+
+
+class SpatialIndex(object):
+    """Packed Hilbert R-tree of feature bounding boxes.
+
+    Features are sorted by the Hilbert code of their bounding box centers,
+    and grouped into nodes of node_size features; nodes are then grouped into
+    parent nodes in the same way, until there is only one (root) node.
+    Bounding box queries only visit the nodes that intersect the query,
+    so the cost is proportional to the number of features that are hit,
+    rather than the number of features in the layer.
+
+    Parameters
+    ----------
+    bounds : 2D numpy array (nfeatures, (xmin, ymin, xmax, ymax))
+        Bounding boxes of features.
+    fids : 1D numpy array
+        Feature id for each bounding box.
+    node_size : int
+        Number of children in each node.
+    presorted : bool
+        If True, the bounds are already in Hilbert order (e.g. levels[0] of another index),
+        and aren't sorted again.
+    """
+    def __init__(self, bounds, fids, node_size=16, presorted=False):
+        bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+        fids = np.asarray(fids, dtype=np.int64)
+        if len(bounds) > 0 and not presorted:
+            extent = (bounds[:, 0].min(), bounds[:, 1].min(),
+                      bounds[:, 2].max(), bounds[:, 3].max())
+            codes = _hilbert_codes((bounds[:, 0] + bounds[:, 2]) / 2,
+                                   (bounds[:, 1] + bounds[:, 3]) / 2, extent)
+            order = np.argsort(codes, kind='mergesort')
+            bounds, fids = bounds[order], fids[order]
+        self.node_size = node_size
+        self.fids = fids
+        # levels[0] are the feature bounds; levels[-1] is the root
+        self.levels = [bounds]
+        while len(self.levels[-1]) > 1:
+            b = self.levels[-1]
+            starts = np.arange(0, len(b), node_size)
+            self.levels.append(np.column_stack([np.minimum.reduceat(b[:, 0], starts),
+                                                np.minimum.reduceat(b[:, 1], starts),
+                                                np.maximum.reduceat(b[:, 2], starts),
+                                                np.maximum.reduceat(b[:, 3], starts)]))
+
+    @property
+    def bounds(self):
+        """Bounds of all features (xmin, ymin, xmax, ymax)."""
+        if len(self.fids) == 0:
+            return (np.nan,) * 4
+        return tuple(self.levels[-1][0])
+
+    def intersection(self, bbox):
+        """Get the feature ids of features with bounding boxes
+        that intersect bbox (xmin, ymin, xmax, ymax).
+
+        Returns
+        -------
+        fids : sorted 1D numpy array
+        """
+        return np.sort(np.asarray(self.fids[self._query(bbox)]))
+
+    def intersection_bounds(self, bbox):
+        """Get the bounds (xmin, ymin, xmax, ymax) of the features with
+        bounding boxes that intersect bbox (xmin, ymin, xmax, ymax)."""
+        return _total_bounds(self.levels[0][self._query(bbox)])
+
+    def _query(self, bbox):
+        """Positions (in levels[0]) of the features that intersect bbox."""
+        if len(self.fids) == 0:
+            return np.array([], dtype=int)
+        xmin, ymin, xmax, ymax = bbox
+
+        def hits(b):
+            return (b[:, 0] <= xmax) & (b[:, 2] >= xmin) & \
+                   (b[:, 1] <= ymax) & (b[:, 3] >= ymin)
+
+        nodes = np.arange(len(self.levels[-1]))
+        nodes = nodes[hits(self.levels[-1])]
+        for level in self.levels[-2::-1]:
+            children = (nodes[:, None] * self.node_size +
+                        np.arange(self.node_size)).ravel()
+            children = children[children < len(level)]
+            nodes = children[hits(level[children])]
+        return nodes
+
+    def save(self, filename, stamp=None):
+        """Save the index (all levels of the tree) to an uncompressed numpy .npz file."""
+        levels = {'level{}'.format(i): b for i, b in enumerate(self.levels[1:], 1)}
+        np.savez(filename, bounds=self.levels[0], fids=self.fids,
+                 node_size=self.node_size, nlevels=len(self.levels),
+                 stamp=stamp if stamp is not None else np.array([], dtype=np.int64),
+                 **levels)
+
+    @classmethod
+    def load(cls, filename, mmap_mode='r'):
+        """Load an index that was saved with SpatialIndex.save.
+        The saved tree is used as is (without sorting the features again), and by default
+        the arrays are memory-mapped, so that queries only read the nodes that they visit.
+        """
+        data = _load_npz(filename, mmap_mode=mmap_mode)
+        if 'nlevels' not in data:
+            # (saved without the upper levels)
+            return cls(data['bounds'], data['fids'], int(data['node_size']), presorted=True)
+        index = cls.__new__(cls)
+        index.node_size = int(data['node_size'])
+        index.fids = data['fids']
+        index.levels = [data['bounds']] + [data['level{}'.format(i)]
+                                           for i in range(1, int(data['nlevels']))]
+        return index
+
+
+def _load_npz(filename, mmap_mode=None):
+    """Load the arrays in a numpy .npz file into a dictionary.
+    If mmap_mode is given, arrays that are stored uncompressed (as with np.savez)
+    are memory-mapped (np.load reads the arrays in .npz files into memory)."""
+    import struct
+    import zipfile
+    with np.load(filename) as data:
+        if mmap_mode is None:
+            return {name: data[name] for name in data.files}
+        arrays = {}
+        header_readers = {(1, 0): np.lib.format.read_array_header_1_0,
+                          (2, 0): np.lib.format.read_array_header_2_0}
+        with zipfile.ZipFile(filename) as zf, open(filename, 'rb') as f:
+            for info in zf.infolist():
+                name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+                if info.compress_type == zipfile.ZIP_STORED:
+                    # skip the local file header, to the start of the .npy file
+                    f.seek(info.header_offset + 26)
+                    name_length, extra_length = struct.unpack('<HH', f.read(4))
+                    f.seek(name_length + extra_length, 1)
+                    version = np.lib.format.read_magic(f)
+                    if version in header_readers:
+                        shape, fortran_order, dtype = header_readers[version](f)
+                        if not dtype.hasobject and int(np.prod(shape)) > 0:
+                            arrays[name] = np.memmap(filename, dtype=dtype, mode=mmap_mode,
+                                                     offset=f.tell(), shape=shape,
+                                                     order='F' if fortran_order else 'C')
+                            continue
+                arrays[name] = data[name]
+        return arrays
+
+
+def _spatial_index_path(shp):
+    return '{}.sidx.npz'.format(os.path.splitext(shp)[0])
+
+
+def build_spatial_index(shp):
+    """Build a persistent spatial index (SpatialIndex) of the feature bounding
+    boxes in a shapefile, and save it next to the shapefile (<shapefile>.sidx.npz).
+    The modification time and size of the .shp file are saved with the index,
+    so that it can be rebuilt when the shapefile changes.
+
+    Returns
+    -------
+    index : SpatialIndex
+    """
+    print('building spatial index for {}...'.format(shp))
+    stamp = _file_stamp(shp)
+    try:
+        from pyogrio import read_bounds
+        fids, bounds = read_bounds(shp)
+        bounds = bounds.T
+    except ImportError:
+        fids, geoms = [], []
+        with fiona.open(shp) as src:
+            for rec in src:
+                fids.append(int(rec['id']))
+                geoms.append(rec['geometry'])
+        fids, bounds = np.array(fids, dtype=np.int64), feature_bounds(geoms)
+    # null geometries aren't indexed
+    valid = ~np.isnan(bounds).any(axis=1)
+    index = SpatialIndex(bounds[valid], fids[valid])
+
+    # write to a temporary file first, so that the index is never partially written
+    outfile = _spatial_index_path(shp)
+    tmpfile = outfile[:-4] + '.tmp.npz'
+    index.save(tmpfile, stamp=stamp)
+    os.replace(tmpfile, outfile)
+    print('wrote {}'.format(outfile))
+    return index
+
+
+def _spatial_index_fids(shp, sindex, filter):
+    """Get the ids of the features in a shapefile that intersect filter
+    (xmin, ymin, xmax, ymax), using its spatial index (a SpatialIndex).
+    Features with bounding boxes inside the filter are selected from the index;
+    those with bounding boxes that only overlap it are read, and their geometries
+    tested against the filter, so that the result is the same as with OGR's filter.
+
+    Returns
+    -------
+    fids : sorted 1D numpy array
+    bounds : 2D numpy array of the bounds of the features
+    """
+    from shapely.geometry import box
+    positions = sindex._query(filter)
+    fids, bounds = np.asarray(sindex.fids[positions]), np.asarray(sindex.levels[0][positions])
+    xmin, ymin, xmax, ymax = filter
+    inside = (bounds[:, 0] >= xmin) & (bounds[:, 1] >= ymin) & \
+             (bounds[:, 2] <= xmax) & (bounds[:, 3] <= ymax)
+    if not inside.all():
+        bbox = box(*filter)
+        with fiona.open(shp) as src:
+            for i in np.where(~inside)[0]:
+                inside[i] = bbox.intersects(shape(src[int(fids[i])]['geometry']))
+    fids, bounds = fids[inside], bounds[inside]
+    order = np.argsort(fids)
+    return fids[order], bounds[order]
+
+
+def load_spatial_index(shp, build=True):
+    """Load the persistent spatial index for a shapefile
+    (see build_spatial_index).
+
+    Parameters
+    ----------
+    shp : str
+        Shapefile
+    build : bool
+        If True (default), build the index if it doesn't exist,
+        or if the shapefile has changed since it was built.
+        Otherwise, return None in those cases.
+
+    Returns
+    -------
+    index : SpatialIndex or None
+    """
+    indexfile = _spatial_index_path(shp)
+    if os.path.exists(indexfile):
+        with np.load(indexfile) as data:
+            current = np.array_equal(data['stamp'], _file_stamp(shp))
+        if current:
+            return SpatialIndex.load(indexfile)
+    if build:
+        return build_spatial_index(shp)
+
 def get_photo_location(photos):
     """Get locations for georeferenced photos using python image library.
 
@@ -104,16 +562,738 @@ def get_photo_location(photos):
     elif len(locations) > 1:
         return locations
 
+
+# locations read by get_photo_locations, keyed by path (with the modification time)
+_photo_location_cache = {}
+
+
+def get_photo_locations(photos, processes=None, cache=None, dropna=True):
+    """Get locations for a large number of georeferenced photos.
+
+    Only the GPS tags are read from each photo's header (see
+    get_lat_lon_exif_pil.read_gps_info), optionally in a pool of processes.
+    Results are cached by path and modification time, so that photos that
+    haven't changed aren't read again.
+
+    Parameters
+    ----------
+    photos : list of strings
+    processes : int, optional
+        Number of processes to read the photos with. By default, photos are read
+        one after the other.
+    cache : str, optional
+        JSON file in which to keep the cached locations between sessions.
+        By default, locations are only cached for the current session.
+    dropna : bool
+        If True (default), photos without a location are dropped.
+
+    Returns
+    -------
+    df : DataFrame
+        With columns photo, lon, lat, altitude, datetime and geometry
+        (shapely Points of lon, lat), ready for df2shp.
+    """
+    try:
+        from .get_lat_lon_exif_pil import get_gps_location
+    except ImportError:
+        from get_lat_lon_exif_pil import get_gps_location
+    if isinstance(photos, str):
+        photos = [photos]
+
+    import json
+    entries = _photo_location_cache
+    if cache is not None and os.path.exists(cache):
+        with open(cache) as src:
+            entries = dict(_photo_location_cache, **json.load(src))
+
+    paths = [os.path.abspath(photo) for photo in photos]
+    mtimes = [os.path.getmtime(path) for path in paths]
+    toread = [path for path, mtime in zip(paths, mtimes)
+              if path not in entries or entries[path][0] != mtime]
+    print('reading {} of {} photos ({} cached)...'.format(len(toread), len(paths),
+                                                         len(paths) - len(toread)))
+    if processes is not None and processes > 1 and len(toread) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            chunksize = max(1, len(toread) // (processes * 4))
+            locations = list(pool.map(get_gps_location, toread, chunksize=chunksize))
+    else:
+        locations = [get_gps_location(path) for path in toread]
+    for path, location in zip(toread, locations):
+        entries[path] = [os.path.getmtime(path)] + list(location)
+    _photo_location_cache.update(entries)
+    if cache is not None and len(toread) > 0:
+        with open(cache, 'w') as dest:
+            json.dump(entries, dest)
+
+    df = pd.DataFrame([entries[path][1:] for path in paths],
+                      columns=['lon', 'lat', 'altitude', 'datetime'], dtype=object)
+    df.insert(0, 'photo', photos)
+    for c in ['lon', 'lat', 'altitude']:
+        df[c] = df[c].astype(float)
+    df['datetime'] = pd.to_datetime(df['datetime'])
+    if dropna:
+        df = df.loc[df.lon.notnull() & df.lat.notnull()].copy()
+    df['geometry'] = [Point(xy) if not np.isnan(xy).any() else None
+                      for xy in zip(df.lon, df.lat)]
+    return df
+
+def _from_wkb(wkb):
+    """Convert an array of WKB geometries (with None for null geometries)
+    to an object array of shapely geometries.
+    Uses the vectorized shapely.from_wkb where available (shapely >= 2.0).
+    """
+    try:
+        from shapely import from_wkb
+        return from_wkb(wkb)
+    except ImportError:
+        from shapely import wkb as shapely_wkb
+        geoms = np.empty(len(wkb), dtype=object)
+        for i, g in enumerate(wkb):
+            if g is not None:
+                geoms[i] = shapely_wkb.loads(g)
+        return geoms
+
+
+_wkb_types = {1: 'Point', 2: 'LineString', 3: 'Polygon', 4: 'MultiPoint',
+              5: 'MultiLineString', 6: 'MultiPolygon', 7: 'GeometryCollection'}
+
+
+class LazyGeometry(object):
+    """Holds a feature geometry in encoded form (WKB bytes, or a GeoJSON
+    mapping as read by fiona), and only converts it to a shapely geometry
+    the first time that it is needed. Attributes and methods of the
+    shapely geometry (e.g. .area, .buffer(), .intersects()) can be
+    used directly on the LazyGeometry.
+
+    The geometry type, bounds and __geo_interface__ (used by
+    shapely.geometry.mapping and df2shp) are available without
+    keeping the decoded geometry in memory.
+
+    Parameters
+    ----------
+    data : bytes or dict
+        WKB or GeoJSON geometry
+    """
+    __slots__ = ('data', '_geom')
+
+    def __init__(self, data):
+        self.data = data
+        self._geom = None
+
+    def _decode(self):
+        if isinstance(self.data, bytes):
+            from shapely import wkb
+            return wkb.loads(self.data)
+        return shape(self.data)
+
+    def to_shapely(self, cache=True):
+        """Return the shapely geometry (decoding it if needed)."""
+        if self._geom is not None:
+            return self._geom
+        geom = self._decode()
+        if cache:
+            self._geom = geom
+        return geom
+
+    @property
+    def type(self):
+        if self._geom is not None:
+            return self._geom.geom_type
+        if isinstance(self.data, bytes):
+            byteorder = 'little' if self.data[0] == 1 else 'big'
+            code = int.from_bytes(self.data[1:5], byteorder) & 0x0FFFFFFF
+            return _wkb_types[code % 1000]
+        return self.data['type']
+
+    geom_type = type
+
+    @property
+    def bounds(self):
+        return self.to_shapely(cache=False).bounds
+
+    @property
+    def __geo_interface__(self):
+        if self._geom is None and not isinstance(self.data, bytes):
+            return self.data
+        return self.to_shapely(cache=False).__geo_interface__
+
+    def __getattr__(self, name):
+        # only delegate to the shapely geometry for public attributes
+        # (otherwise unset slots will recurse, e.g. when unpickling)
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.to_shapely(), name)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyGeometry):
+            other = other.to_shapely(cache=False)
+        return self.to_shapely(cache=False) == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return self.data
+
+    def __setstate__(self, data):
+        self.data = data
+        self._geom = None
+
+    def __repr__(self):
+        return '<LazyGeometry {}>'.format(self.type)
+
+
+def decode_geometries(geoms):
+    """Convert a sequence of geometries (e.g. a geometry column read
+    with shp2df(lazy_geometry=True)) to shapely geometries in bulk.
+    WKB geometries are all decoded in one call to shapely where possible.
+
+    Parameters
+    ----------
+    geoms : sequence of LazyGeometry, WKB bytes, GeoJSON mappings,
+        shapely geometries or None
+
+    Returns
+    -------
+    decoded : 1D numpy array (dtype object) of shapely geometries (or None)
+    """
+    decoded = np.empty(len(geoms), dtype=object)
+    wkb = np.empty(len(geoms), dtype=object)
+    for i, g in enumerate(geoms):
+        if isinstance(g, LazyGeometry):
+            if g._geom is not None:
+                decoded[i] = g._geom
+                continue
+            g = g.data
+        if isinstance(g, bytes):
+            wkb[i] = g
+        elif isinstance(g, dict) or hasattr(g, 'keys'):
+            decoded[i] = shape(g)
+        else:
+            decoded[i] = g
+    iswkb = np.array([g is not None for g in wkb], dtype=bool)
+    if iswkb.any():
+        decoded[iswkb] = _from_wkb(wkb[iswkb])
+    return decoded
+
+
+def _records_to_df(records, geometry=True, skip_empty_geom=True,
+                   lazy_geometry=False):
+    """Build a DataFrame from an iterable of fiona records.
+    """
+    attributes = []
+    for line in records:
+        props = line['properties']
+        if geometry:
+            props['geometry'] = line.get('geometry', None)
+        attributes.append(props)
+    print('--> building dataframe... (may take a while for large shapefiles)')
+    shp_df = pd.DataFrame(attributes)
+    # reorder fields in the DataFrame to match the input shapefile
+    if len(attributes) > 0:
+        shp_df = shp_df[list(attributes[0].keys())]
+
+    # handle null geometries
+    if geometry and len(shp_df) > 0:
+        # (lazy geometries keep fiona's GeoJSON mapping, and are decoded when first used)
+        to_geom = LazyGeometry if lazy_geometry else shape
+        geoms = shp_df.geometry.tolist()
+        if geoms.count(None) == 0:
+            shp_df['geometry'] = [to_geom(g) for g in geoms]
+        elif skip_empty_geom:
+            null_geoms = [i for i, g in enumerate(geoms) if g is None]
+            shp_df.drop(null_geoms, axis=0, inplace=True)
+            shp_df['geometry'] = [to_geom(g) for g in shp_df.geometry.tolist()]
+        else:
+            shp_df['geometry'] = [to_geom(g) if g is not None else None
+                                  for g in geoms]
+    return shp_df
+
+
+def _match_fields(names, fields):
+    """Match field names to those in a file, ignoring capitalization."""
+    lookup = {f.lower(): f for f in fields}
+    missing = [n for n in names if n.lower() not in lookup]
+    if len(missing) > 0:
+        raise KeyError('field(s) {} not found in {}'.format(missing, fields))
+    return [lookup[n.lower()] for n in names]
+
+
+_drivers = {'.shp': 'ESRI Shapefile', '.dbf': 'ESRI Shapefile',
+            '.gpkg': 'GPKG', '.fgb': 'FlatGeobuf', '.gdb': 'OpenFileGDB',
+            '.parquet': 'Parquet', '.geoparquet': 'Parquet'}
+
+
+def _get_driver(filename, driver=None):
+    """Get the OGR driver for a file from its extension
+    (shapefile by default), unless a driver is specified.
+    'Parquet' (GeoParquet) files are read and written with pyarrow."""
+    if driver is not None:
+        return driver
+    ext = os.path.splitext(filename.rstrip('/\\'))[1].lower()
+    return _drivers.get(ext, 'ESRI Shapefile')
+
+
+def _open_collection(shp, layer=None, columns=None, index=None, geometry=True):
+    """Open a fiona collection for reading, with OGR set to skip the
+    attribute fields that aren't in columns (or the index), and the geometry
+    if geometry=False, so that they are never converted to python objects.
+    """
+    ignore_fields = None
+    if columns is not None:
+        with fiona.open(shp, 'r', layer=layer) as src:
+            fields = list(src.schema['properties'].keys())
+        if index is not None:
+            columns = list(columns) + [index]
+        keep = _match_fields(columns, fields)
+        ignore_fields = [f for f in fields if f not in keep]
+    return fiona.open(shp, 'r', layer=layer, ignore_fields=ignore_fields,
+                      ignore_geometry=not geometry)
+
+
+def _where_fids(shp_obj, where, filter=None):
+    """Get the ids of the features in an open fiona collection that match
+    an OGR SQL where clause (and bounding box filter), evaluated by OGR through pyogrio
+    (for fiona < 1.9, which doesn't support where)."""
+    try:
+        from pyogrio.raw import read
+    except ImportError:
+        raise ValueError('where requires fiona >= 1.9, or pyogrio')
+    if shp_obj.schema.get('geometry', 'None') == 'None':
+        filter = None
+    # (the bounding box filter is only applied if the geometries are read)
+    fids = read(shp_obj.path, layer=shp_obj.name, columns=[], read_geometry=filter is not None,
+                where=where, bbox=filter, return_fids=True)[1]
+    return np.sort(np.asarray(fids, dtype=np.int64))
+
+
+def _open_records(shp_obj, index=None, clipto=None, filter=None, where=None,
+                  fids=None):
+    """Iterate over the records in an open fiona collection,
+    limited to the bounding box filter, where clause and clipto list,
+    or to the feature ids in fids (which are read by random access).
+
+    Returns
+    -------
+    records : generator of fiona records
+    index : str
+        Name of index field, with the capitalization used in the file.
+    geometry : bool
+        Whether the records have geometry (False for DBF files).
+    """
+    if index is not None:
+        # handle capitolization issues with index field name
+        fields = list(shp_obj.schema['properties'].keys())
+        index = _match_fields([index], fields)[0]
+
+    kwargs = {}
+    if where is not None:
+        print('filtering on {}...'.format(where))
+        if tuple(map(int, fiona.__version__.split('.')[:2])) < (1, 9):
+            # older versions of fiona can't pass a where clause to OGR;
+            # get the ids of the matching features from pyogrio instead
+            where_fids = _where_fids(shp_obj, where, filter=filter)
+            fids = where_fids if fids is None else np.intersect1d(fids, where_fids)
+        else:
+            kwargs['where'] = where
+
+    # for reading in DBF files (just like shps, but without geometry)
+    # (or shapefiles opened with ignore_geometry=True)
+    geometry = shp_obj.schema.get('geometry', 'None') != 'None'
+    if fids is not None:
+        records = (shp_obj[int(fid)] for fid in fids)
+    elif geometry:
+        if filter is not None:
+            print('filtering on bounding box {}, {}, {}, {}...'.format(*filter))
+        records = shp_obj.filter(bbox=filter, **kwargs)
+    elif where is not None:
+        records = shp_obj.filter(**kwargs)
+    else:
+        records = iter(shp_obj)
+    if clipto is not None: # limit what is brought in to items in index of clipto
+        records = (line for line in records
+                   if line['properties'][index] in clipto)
+    return records, index, geometry
+
+
+def _read_records(shp, index=None, clipto=None, filter=None, layer=None,
+                  skip_empty_geom=True, columns=None, geometry=True, where=None,
+                  lazy_geometry=False, fids=None):
+    """Read a shapefile/DBF or FileGDB layer into a DataFrame with fiona,
+    one record at a time.
+
+    Returns
+    -------
+    shp_df : DataFrame
+    index : str
+        Name of index field, with the capitalization used in the file.
+    """
+    with _open_collection(shp, layer=layer, columns=columns, index=index,
+                          geometry=geometry) as shp_obj:
+        records, index, geometry = _open_records(shp_obj, index=index,
+                                                 clipto=clipto, filter=filter,
+                                                 where=where, fids=fids)
+        shp_df = _records_to_df(records, geometry=geometry,
+                                skip_empty_geom=skip_empty_geom,
+                                lazy_geometry=lazy_geometry)
+    if geometry and len(shp_df) == 0:
+        print('Empty dataframe! No features were read.')
+        if filter is not None:
+            print('Check filter {} for consistency \
+with shapefile coordinate system'.format(filter))
+    return shp_df, index
+
+
+def _remap_booleans(df, true_values=None, false_values=None):
+    """Convert any columns containing true_values or false_values
+    to numpy boolean data."""
+    replace_boolean = {}
+    for t in true_values or []:
+        replace_boolean[t] = True
+    for f in false_values or []:
+        replace_boolean[f] = False
+
+    # only remap columns that have values to be replaced
+    cols = [c for c in df.columns if c != 'geometry']
+    for c in cols:
+        if len(set(replace_boolean.keys()).intersection(set(df[c]))) > 0:
+            df[c] = df[c].map(replace_boolean)
+    return df
+
+
+def _read_columnar(shp, index=None, clipto=None, filter=None, layer=None,
+                   skip_empty_geom=True, columns=None, geometry=True, where=None,
+                   lazy_geometry=False, fids=None):
+    """Read a shapefile/DBF or FileGDB layer into a DataFrame using pyogrio,
+    which fills a typed numpy array for each attribute field and returns the
+    feature geometries as an array of WKB, so that no python objects are
+    created on a per-feature basis until the geometry column is built.
+
+    Returns
+    -------
+    shp_df : DataFrame
+        Same structure and dtypes as the record-by-record reader in shp2df.
+    index : str
+        Name of index field, with the capitalization used in the file.
+    """
+    try:
+        from pyogrio import read_info
+        from pyogrio.raw import read
+    except ImportError:
+        raise ImportError('engine="pyogrio" requires pyogrio.')
+
+    if columns is not None:
+        fields = list(read_info(shp, layer=layer)['fields'])
+        if index is not None:
+            columns = list(columns) + [index]
+        columns = _match_fields(columns, fields)
+    meta, _, wkb, field_data = read(shp, layer=layer, bbox=filter,
+                                    columns=columns, read_geometry=geometry,
+                                    where=where, fids=fids)
+    fields = list(meta['fields'])
+    if index is not None:
+        # handle capitolization issues with index field name
+        index = _match_fields([index], fields)[0]
+
+    data = OrderedDict()
+    for name, values in zip(fields, field_data):
+        # fiona reads dates as ISO strings
+        # (keep them as datetimes for formats with typed date fields)
+        if values.dtype.kind == 'M' and _get_driver(shp) == 'ESRI Shapefile':
+            isnat = np.isnat(values)
+            values = np.datetime_as_string(values).astype(object)
+            values[isnat] = None
+        # fiona returns python ints and floats, which pandas stores as 64 bit
+        elif values.dtype.kind in 'iu' and values.dtype.itemsize < 8:
+            values = values.astype(np.int64)
+        elif values.dtype.kind == 'f' and values.dtype.itemsize < 8:
+            values = values.astype(np.float64)
+        data[name] = values
+
+    # limit what is brought in to items in index of clipto
+    if clipto is not None:
+        keep = pd.Series(data[index]).isin(clipto).values
+        data = OrderedDict((k, v[keep]) for k, v in data.items())
+        if wkb is not None:
+            wkb = wkb[keep]
+
+    print('--> building dataframe...')
+    shp_df = pd.DataFrame(data, columns=fields)
+    if wkb is not None:
+        if len(shp_df) == 0:
+            print('Empty dataframe! No features were read.')
+            if filter is not None:
+                print('Check filter {} for consistency \
+with shapefile coordinate system'.format(filter))
+        if lazy_geometry:
+            shp_df['geometry'] = [LazyGeometry(g) if g is not None else None
+                                  for g in wkb]
+        else:
+            shp_df['geometry'] = _from_wkb(wkb)
+        if skip_empty_geom:
+            shp_df = shp_df.loc[shp_df.geometry.notnull().values]
+    return shp_df, index
+
+
+def _read_geoparquet(shp, index=None, clipto=None, filter=None, layer=None,
+                     skip_empty_geom=True, columns=None, geometry=True, where=None,
+                     lazy_geometry=False, fids=None):
+    """Read a GeoParquet file into a DataFrame using pyarrow.
+    If the file has a bounding box column (a GeoParquet "covering", as
+    written by df2shp), a filter is applied to it as the file is read,
+    so that row groups outside of the filter are skipped using the
+    column statistics.
+
+    Returns
+    -------
+    shp_df : DataFrame
+    index : str
+        Name of index field, with the capitalization used in the file.
+    """
+    try:
+        import json
+        import pyarrow.parquet as pq
+        import pyarrow.compute as pc
+    except ImportError:
+        raise ImportError('Reading GeoParquet files requires pyarrow.')
+    if where is not None:
+        raise ValueError('where is not supported for GeoParquet files')
+    if layer is not None:
+        raise ValueError('GeoParquet files only have one layer')
+
+    schema = pq.read_schema(shp)
+    metadata = json.loads(schema.metadata[b'geo'])
+    geo_column = metadata['primary_column']
+    covering = metadata['columns'][geo_column].get('covering', {}).get('bbox')
+    bbox_column = covering['xmin'][0] if covering is not None else None
+    fields = [f for f in schema.names if f not in (geo_column, bbox_column)
+              and not f.startswith('__index_level')]
+    if columns is not None:
+        if index is not None:
+            columns = list(columns) + [index]
+        fields = _match_fields(columns, fields)
+    if index is not None:
+        # handle capitolization issues with index field name
+        index = _match_fields([index], fields)[0]
+
+    read_columns = list(fields)
+    if geometry or (filter is not None and bbox_column is None):
+        read_columns.append(geo_column)
+    expression = None
+    if filter is not None and bbox_column is not None:
+        print('filtering on bounding box {}, {}, {}, {}...'.format(*filter))
+        xmin, ymin, xmax, ymax = filter
+        expression = ((pc.field(*covering['xmin']) <= xmax) &
+                      (pc.field(*covering['xmax']) >= xmin) &
+                      (pc.field(*covering['ymin']) <= ymax) &
+                      (pc.field(*covering['ymax']) >= ymin))
+    table = pq.read_table(shp, columns=read_columns, filters=expression)
+    if fids is not None:
+        table = table.take(np.asarray(fids, dtype=int))
+
+    wkb = None
+    if geo_column in read_columns:
+        wkb = table.column(geo_column).to_numpy(zero_copy_only=False)
+        table = table.drop([geo_column])
+    print('--> building dataframe...')
+    shp_df = table.to_pandas()
+    keep = np.ones(len(shp_df), dtype=bool)
+    if clipto is not None:
+        keep &= shp_df[index].isin(clipto).values
+    if wkb is not None:
+        geoms = None
+        if not (geometry and lazy_geometry) or (filter is not None and bbox_column is None):
+            geoms = _from_wkb(wkb)
+        if filter is not None and bbox_column is None:
+            bounds = feature_bounds(geoms)
+            keep &= ((bounds[:, 0] <= filter[2]) & (bounds[:, 2] >= filter[0]) &
+                     (bounds[:, 1] <= filter[3]) & (bounds[:, 3] >= filter[1]))
+        if geometry:
+            if lazy_geometry:
+                shp_df['geometry'] = [LazyGeometry(g) if g is not None else None
+                                      for g in wkb]
+            else:
+                shp_df['geometry'] = geoms
+            if skip_empty_geom:
+                keep &= shp_df.geometry.notnull().values
+    shp_df = shp_df.loc[keep]
+    if len(shp_df) == 0:
+        print('Empty dataframe! No features were read.')
+    return shp_df, index
+
+
+def _to_wkb(geoms):
+    """Convert a sequence of shapely geometries or LazyGeometry objects
+    (or None) to a 1D numpy object array of WKB."""
+    wkb = np.empty(len(geoms), dtype=object)
+    for i, g in enumerate(geoms):
+        if isinstance(g, LazyGeometry):
+            wkb[i] = g.data if isinstance(g.data, bytes) else g.to_shapely(cache=False).wkb
+        elif g is not None:
+            wkb[i] = g.wkb
+    return wkb
+
+
+def _source_files(shp):
+    """Files that make up a shapefile or FileGDB."""
+    if os.path.isdir(shp):
+        return sorted(os.path.join(shp, f) for f in os.listdir(shp))
+    basename = os.path.splitext(shp)[0]
+    files = [shp] + [basename + ext for ext in ('.shp', '.shx', '.dbf', '.prj', '.cpg')]
+    return [f for f in OrderedDict.fromkeys(files) if os.path.exists(f)]
+
+
+class DataFrameCache(object):
+    """On-disk cache of DataFrames read by shp2df.
+
+    Entries are keyed on the paths, sizes and modification times of the source files
+    (or a hash of their contents, if hash_files=True), the layer, and the other arguments
+    to shp2df. DataFrames are stored in the Feather format (geometries as WKB),
+    which requires pyarrow; DataFrames that can't be converted to Feather are pickled.
+    When the total size of the cache exceeds max_size, the least recently used entries are removed.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Folder for cache files.
+    max_size : int
+        Maximum total size of the cache files, in bytes (default 10 GB).
+    hash_files : bool
+        Key on a hash of the source file contents, instead of their modification times.
+
+    Attributes
+    ----------
+    stats : dict
+        Numbers of hits, misses and evictions, and bytes read and written,
+        since the cache object was created.
+
+    Examples
+    --------
+    >>> cache = DataFrameCache('shp2df_cache', max_size=2e9)
+    >>> df = shp2df('parcels.shp', cache=cache)
+    >>> print(cache.stats)
+    """
+    extensions = ('.feather', '.pkl')
+
+    def __init__(self, cache_dir, max_size=10e9, hash_files=False):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.hash_files = hash_files
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0,
+                      'bytes_read': 0, 'bytes_written': 0}
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
+    def _file_id(self, filename):
+        if self.hash_files:
+            import hashlib
+            sha = hashlib.sha256()
+            with open(filename, 'rb') as src:
+                for block in iter(lambda: src.read(2**20), b''):
+                    sha.update(block)
+            return sha.hexdigest()
+        info = os.stat(filename)
+        return [info.st_size, info.st_mtime_ns]
+
+    def key(self, shplist, **kwargs):
+        """Make a cache key from the source files and shp2df arguments."""
+        import hashlib
+        import json
+        if isinstance(shplist, str):
+            shplist = [shplist]
+        sources = [[os.path.abspath(f), self._file_id(f)]
+                   for shp in shplist for f in _source_files(shp)]
+
+        def default(obj):
+            if isinstance(obj, (np.ndarray, pd.Index, pd.Series, set, tuple)):
+                return sorted(obj, key=str) if isinstance(obj, set) else list(obj)
+            if isinstance(obj, np.generic):
+                return obj.item()
+            return str(obj)
+        text = json.dumps([sources, kwargs], sort_keys=True, default=default)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def _entries(self):
+        return [os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir)
+                if os.path.splitext(f)[1] in self.extensions]
+
+    def get(self, key, lazy_geometry=False):
+        """Get a cached DataFrame, or None if the key isn't in the cache."""
+        for ext in self.extensions:
+            filename = os.path.join(self.cache_dir, key + ext)
+            if os.path.exists(filename):
+                break
+        else:
+            self.stats['misses'] += 1
+            return None
+        if ext == '.feather':
+            df = pd.read_feather(filename)
+            df.index = df.pop('__index__').values
+            if 'geometry' in df.columns:
+                if lazy_geometry:
+                    df['geometry'] = [LazyGeometry(g) if g is not None else None
+                                      for g in df.geometry]
+                else:
+                    df['geometry'] = _from_wkb(df.geometry.values)
+        else:
+            df = pd.read_pickle(filename)
+        os.utime(filename)  # mark as recently used
+        self.stats['hits'] += 1
+        self.stats['bytes_read'] += os.path.getsize(filename)
+        print('read {} from cache'.format(filename))
+        return df
+
+    def put(self, key, df):
+        """Add a DataFrame to the cache, removing least recently used entries
+        if the cache is larger than max_size."""
+        out = df.reset_index(drop=True)
+        out['__index__'] = df.index.values
+        filename = os.path.join(self.cache_dir, key + '.feather')
+        try:
+            if 'geometry' in out.columns:
+                out['geometry'] = _to_wkb(out.geometry)
+            out.to_feather(filename + '.tmp')
+        except Exception:
+            filename = os.path.join(self.cache_dir, key + '.pkl')
+            df.to_pickle(filename + '.tmp')
+        os.replace(filename + '.tmp', filename)
+        self.stats['bytes_written'] += os.path.getsize(filename)
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache is no larger than max_size."""
+        entries = sorted(self._entries(), key=os.path.getmtime)
+        total = sum(os.path.getsize(f) for f in entries)
+        for f in entries:
+            if total <= self.max_size:
+                break
+            total -= os.path.getsize(f)
+            os.remove(f)
+            self.stats['evictions'] += 1
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        for f in self._entries():
+            os.remove(f)
+
+
 def shp2df(shplist, index=None, index_dtype=None, clipto=[], filter=None,
            true_values=None, false_values=None, layer=None,
-           skip_empty_geom=True):
+           skip_empty_geom=True, columns=None, geometry=True, where=None,
+           lazy_geometry=False, key_index=False, spatial_index=None,
+           engine='fiona', processes=None, cache=None, driver=None):
     """Read shapefile/DBF, list of shapefiles/DBFs, or File geodatabase (GDB)
      into pandas DataFrame.
 
     Parameters
     ----------
     shplist : string or list
-        of shapefile/DBF name(s) or FileGDB
+        of shapefile/DBF name(s) or FileGDB. GeoPackage (.gpkg), FlatGeobuf (.fgb)
+        and GeoParquet (.parquet) files can also be read; bounding box filters
+        on these use their native spatial index (or bounding box column, for GeoParquet).
     index : string
         Column to use as index for dataframe
     index_dtype : dtype
@@ -132,6 +1312,52 @@ def shp2df(shplist, index=None, index_dtype=None, clipto=[], filter=None,
     skip_empty_geom : True/False, default True
         Drops shapefile entries with null geometries.
         DBF files (which specify null geometries in their schema) will still be read.
+    columns : list, optional
+        Attribute fields to read (the index field is always read).
+        Other fields are skipped by OGR, and never converted to python objects.
+        By default, all fields are read.
+    geometry : True/False, default True
+        If False, feature geometries are not read, and
+        the DataFrame is returned without a geometry column.
+    where : str, optional
+        Attribute filter in the form of an OGR SQL WHERE clause
+        (e.g. "AREA > 100 AND TYPE = 'lake'"), which is evaluated by OGR
+        as the records are read. With fiona < 1.9 (and engine='fiona'),
+        the matching features are found with pyogrio, and then read by fiona.
+    lazy_geometry : True/False, default False
+        If True, the geometry column holds LazyGeometry objects, which keep each geometry
+        in encoded form, and only convert it to a shapely geometry when it is first used.
+        Use decode_geometries() to convert a whole column at once.
+        The geometries are read directly as compact WKB with pyogrio (with either engine,
+        if pyogrio is installed); otherwise, fiona's GeoJSON mappings are kept.
+    key_index : True/False, default False
+        If True, clipto reads of shapefiles/DBFs use a sidecar index of the values
+        in the index field (see build_key_index) to read only the matching features,
+        instead of scanning the whole file. The sidecar is built on the first read,
+        and rebuilt whenever the DBF changes. Not used in combination with where, or with
+        filter unless the spatial index is also used.
+    spatial_index : True/False/None, default None
+        Use a persistent spatial index of the shapefile (see build_spatial_index)
+        to read only the features within filter, instead of testing every feature.
+        The geometries of features with bounding boxes that overlap the edge of the
+        filter are tested, so the same features are selected as without the index.
+        If None (default), the index is used if it exists and is up to date.
+        If True, the index is built if needed. Not used in combination with where.
+    engine : {'fiona', 'pyogrio'}
+        Reader to use. 'fiona' (default) builds the DataFrame one record at a time.
+        'pyogrio' reads each attribute field directly into a typed numpy array and
+        builds the geometry column in bulk from WKB; much faster, and uses much less
+        memory on large files (requires pyogrio).
+    processes : int, optional
+        Number of processes to use for reading a list of files concurrently.
+        By default, files are read one after the other.
+    cache : DataFrameCache or str, optional
+        Cache (or folder for a cache) in which to store the DataFrame, and from which it is
+        returned on subsequent calls with the same files and arguments (see DataFrameCache).
+    driver : str, optional
+        Format of the files ('ESRI Shapefile', 'GPKG', 'FlatGeobuf', 'Parquet', ...).
+        By default, the format is determined from the file extension.
+        GeoParquet files are read with pyarrow (with either engine).
 
     Returns
     -------
@@ -150,103 +1376,280 @@ def shp2df(shplist, index=None, index_dtype=None, clipto=[], filter=None,
     else:
         clip = False
 
-    df = pd.DataFrame()
-    for shp in shplist:
-        print("\nreading {}...".format(shp))
-        shp_obj = fiona.open(shp, 'r', layer=layer)
+    if engine not in ('fiona', 'pyogrio'):
+        raise ValueError("engine must be 'fiona' or 'pyogrio'")
+
+    if cache is not None:
+        if isinstance(cache, str):
+            cache = DataFrameCache(cache)
+        key = cache.key(shplist, index=index, index_dtype=index_dtype,
+                        clipto=clipto if clip else None, filter=filter,
+                        true_values=true_values, false_values=false_values,
+                        layer=layer, skip_empty_geom=skip_empty_geom,
+                        columns=columns, geometry=geometry, where=where,
+                        spatial_index=spatial_index, engine=engine, driver=driver)
+        df = cache.get(key, lazy_geometry=lazy_geometry)
+        if df is not None:
+            return df
+
+    read_file = partial(_shp2df_file, index=index, index_dtype=index_dtype,
+                        clipto=clipto if clip else None, filter=filter,
+                        true_values=true_values, false_values=false_values,
+                        layer=layer, skip_empty_geom=skip_empty_geom,
+                        columns=columns, geometry=geometry, where=where,
+                        lazy_geometry=lazy_geometry, key_index=key_index,
+                        spatial_index=spatial_index, engine=engine, driver=driver)
+    if processes is not None and processes > 1 and len(shplist) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        print('reading {} files with {} processes...'.format(len(shplist), processes))
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            dfs = list(pool.map(read_file, shplist))
+    else:
+        dfs = [read_file(shp) for shp in shplist]
+    dfs = [shp_df for shp_df in dfs if len(shp_df) > 0]
 
-        if index is not None:
-            # handle capitolization issues with index field name
-            fields = list(shp_obj.schema['properties'].keys())
-            index = [f for f in fields if index.lower() == f.lower()][0]
-
-        attributes = []
-        # for reading in shapefiles
-        meta = shp_obj.meta
-        if meta['schema']['geometry'] != 'None':
-            if filter is not None:
-                print('filtering on bounding box {}, {}, {}, {}...'.format(*filter))
-            if clip: # limit what is brought in to items in index of clipto
-                for line in shp_obj.filter(bbox=filter):
-                    props = line['properties']
-                    if not props[index] in clipto:
-                        continue
-                    props['geometry'] = line.get('geometry', None)
-                    attributes.append(props)
-            else:
-                for line in shp_obj.filter(bbox=filter):
-
-                    props = line['properties']
-                    props['geometry'] = line.get('geometry', None)
-                    attributes.append(props)
-            print('--> building dataframe... (may take a while for large shapefiles)')
-            shp_df = pd.DataFrame(attributes)
-            # reorder fields in the DataFrame to match the input shapefile
-            if len(attributes) > 0:
-                shp_df = shp_df[list(attributes[0].keys())]
-
-            # handle null geometries
-            if len(shp_df) == 0:
-                print('Empty dataframe! No features were read.')
-                if filter is not None:
-                    print('Check filter {} for consistency \
-with shapefile coordinate system'.format(filter))
-            geoms = shp_df.geometry.tolist()
-            if geoms.count(None) == 0:
-                shp_df['geometry'] = [shape(g) for g in geoms]
-            elif skip_empty_geom:
-                null_geoms = [i for i, g in enumerate(geoms) if g is None]
-                shp_df.drop(null_geoms, axis=0, inplace=True)
-                shp_df['geometry'] = [shape(g) for g in shp_df.geometry.tolist()]
-            else:
-                shp_df['geometry'] = [shape(g) if g is not None else None
-                                      for g in geoms]
+    if len(dfs) == 0:
+        df = pd.DataFrame()
+    elif len(dfs) == 1:
+        df = dfs[0]
+    else:
+        df = _concat_dfs(dfs)
+    if cache is not None:
+        cache.put(key, df)
+    return df
 
-        # for reading in DBF files (just like shps, but without geometry)
-        else:
-            if clip: # limit what is brought in to items in index of clipto
-                for line in shp_obj:
-                    props = line['properties']
-                    if not props[index] in clipto:
-                        continue
-                    attributes.append(props)
-            else:
-                for line in shp_obj:
-                    attributes.append(line['properties'])
-            print('--> building dataframe... (may take a while for large shapefiles)')
-            shp_df = pd.DataFrame(attributes)
-            # reorder fields in the DataFrame to match the input shapefile
-            if len(attributes) > 0:
-                shp_df = shp_df[list(attributes[0].keys())]
-
-        shp_obj.close()
-        if len(shp_df) == 0:
-            continue
-        # set the dataframe index from the index column
-        if index is not None:
-            if index_dtype is not None:
-                shp_df[index] = shp_df[index].astype(index_dtype)
-            shp_df.index = shp_df[index].values
-
-        df = df.append(shp_df)
-
-        # convert any t/f columns to numpy boolean data
-        if true_values is not None or false_values is not None:
-            replace_boolean = {}
-            for t in true_values:
-                replace_boolean[t] = True
-            for f in false_values:
-                replace_boolean[f] = False
-
-            # only remap columns that have values to be replaced
-            cols = [c for c in df.columns if c != 'geometry']
-            for c in cols:
-                if len(set(replace_boolean.keys()).intersection(set(df[c]))) > 0:
-                    df[c] = df[c].map(replace_boolean)
-        
+
+def _shp2df_file(shp, index=None, index_dtype=None, clipto=None, filter=None,
+                 true_values=None, false_values=None, layer=None,
+                 skip_empty_geom=True, columns=None, geometry=True, where=None,
+                 lazy_geometry=False, key_index=False, spatial_index=None,
+                 engine='fiona', driver=None):
+    """Read a single shapefile/DBF or FileGDB layer for shp2df,
+    and apply the index and boolean handling to it."""
+    print("\nreading {}...".format(shp))
+    driver = _get_driver(shp, driver)
+    # get the feature ids to read from the sidecar index files, if they are used
+    # (other formats have their own spatial index)
+    fids = None
+    if driver == 'ESRI Shapefile' and layer is None and where is None:
+        if filter is not None and spatial_index is not False:
+            sindex = load_spatial_index(shp, build=bool(spatial_index))
+            if sindex is not None:
+                fids, _ = _spatial_index_fids(shp, sindex, filter)
+                print('--> reading {} features within {}, {}, {}, {} from spatial index...'.format(
+                    len(fids), *filter))
+                filter = None
+        if key_index and clipto is not None and filter is None:
+            key_fids = _key_index_fids(shp, index, clipto)
+            fids = key_fids if fids is None else np.intersect1d(fids, key_fids)
+            print('--> reading {} features from key index...'.format(len(fids)))
+    if driver == 'Parquet':
+        reader = _read_geoparquet
+    elif engine == 'pyogrio':
+        reader = _read_columnar
+    else:
+        reader = _read_records
+    # lazy geometries are read as WKB directly with pyogrio, if it's installed
+    # (otherwise the fiona reader keeps the GeoJSON mappings)
+    if reader is _read_records and lazy_geometry and geometry:
+        try:
+            import pyogrio
+            reader = _read_columnar
+        except ImportError:
+            pass
+    shp_df, index = reader(shp, index=index, clipto=clipto, filter=filter,
+                           layer=layer, skip_empty_geom=skip_empty_geom,
+                           columns=columns, geometry=geometry, where=where,
+                           lazy_geometry=lazy_geometry, fids=fids)
+    if len(shp_df) == 0:
+        return shp_df
+    return _set_index_and_booleans(shp_df, index, index_dtype,
+                                   true_values, false_values)
+
+
+def _set_index_and_booleans(shp_df, index=None, index_dtype=None,
+                            true_values=None, false_values=None):
+    # set the dataframe index from the index column
+    if index is not None:
+        if index_dtype is not None:
+            shp_df[index] = shp_df[index].astype(index_dtype)
+        shp_df.index = shp_df[index].values
+
+    # convert any t/f columns to numpy boolean data
+    if true_values is not None or false_values is not None:
+        shp_df = _remap_booleans(shp_df, true_values, false_values)
+    return shp_df
+
+
+def _concat_dfs(dfs):
+    """Concatenate DataFrames read from different files, reconciling
+    differences in their schemas. Field names that only differ by case
+    are given the capitalization in which they first appear; fields that
+    are missing from some files are filled with nulls; and fields with different
+    dtypes in different files are cast to a common dtype by pandas.concat.
+    The geometry column is kept last.
+    """
+    names = {}
+    for i, df in enumerate(dfs):
+        for c in df.columns:
+            names.setdefault(str(c).lower(), c)
+        rename = {c: names[str(c).lower()] for c in df.columns
+                  if c != names[str(c).lower()]}
+        if len(rename) > 0:
+            dfs[i] = df.rename(columns=rename)
+    df = pd.concat(dfs, sort=False)
+    if 'geometry' in df.columns:
+        df = df[[c for c in df.columns if c != 'geometry'] + ['geometry']]
     return df
 
 
+def shp2df_chunks(shplist, chunksize=100000, index=None, index_dtype=None,
+                  clipto=[], filter=None, true_values=None, false_values=None,
+                  layer=None, skip_empty_geom=True, columns=None, geometry=True,
+                  where=None, lazy_geometry=False):
+    """Read shapefile/DBF, list of shapefiles/DBFs, or File geodatabase (GDB)
+    into a series of pandas DataFrames, so that large files can be processed
+    without loading the whole layer into memory.
+
+    Parameters
+    ----------
+    shplist : string or list
+        of shapefile/DBF name(s) or FileGDB
+    chunksize : int
+        Number of features in each DataFrame (the last chunk of each file may be smaller,
+        as may chunks where features with null geometries were dropped).
+    index, index_dtype, clipto, filter, true_values, false_values, layer, skip_empty_geom,
+    columns, geometry, where, lazy_geometry :
+        see shp2df
+
+    Yields
+    ------
+    df : DataFrame
+        with attribute fields as columns; feature geometries are stored as
+    shapely geometry objects in the 'geometry' column.
+
+    Examples
+    --------
+    >>> for df in shp2df_chunks('flowlines.shp', chunksize=50000):
+    ...     df['geometry'] = projectdf(df, '+init=epsg:4269', '+init=epsg:26715')
+    """
+    if isinstance(shplist, str):
+        shplist = [shplist]
+    if not isinstance(true_values, list) and true_values is not None:
+        true_values = [true_values]
+    if not isinstance(false_values, list)  and false_values is not None:
+        false_values = [false_values]
+    if len(clipto) > 0 and index:
+        clip = True
+    else:
+        clip = False
+
+    for shp in shplist:
+        print("\nreading {} in chunks of {} features...".format(shp, chunksize))
+        with _open_collection(shp, layer=layer, columns=columns, index=index,
+                              geometry=geometry) as shp_obj:
+            records, shp_index, has_geometry = _open_records(shp_obj, index=index,
+                                                             clipto=clipto if clip else None,
+                                                             filter=filter, where=where)
+            while True:
+                chunk = list(itertools.islice(records, chunksize))
+                if len(chunk) == 0:
+                    break
+                shp_df = _records_to_df(chunk, geometry=has_geometry,
+                                        skip_empty_geom=skip_empty_geom,
+                                        lazy_geometry=lazy_geometry)
+                del chunk
+                if len(shp_df) == 0:
+                    continue
+                yield _set_index_and_booleans(shp_df, shp_index, index_dtype,
+                                              true_values, false_values)
+
+
+def _key_index_path(shp, field):
+    return '{}.{}.idx.npz'.format(os.path.splitext(shp)[0], field.lower())
+
+
+def _file_stamp(filename):
+    """Modification time and size of a file, for invalidating sidecar files."""
+    info = os.stat(filename)
+    return np.array([info.st_mtime_ns, info.st_size], dtype=np.int64)
+
+
+def _dbf_stamp(shp):
+    return _file_stamp(os.path.splitext(shp)[0] + '.dbf')
+
+
+def build_key_index(shp, field):
+    """Build a sidecar index file (<shapefile>.<field>.idx.npz) of the values
+    in an attribute field of a shapefile or DBF, sorted by value, with the
+    feature id of each. The modification time and size of the DBF are saved
+    with the index, so that it can be rebuilt when the DBF changes.
+
+    Parameters
+    ----------
+    shp : str
+        Shapefile or DBF
+    field : str
+        Attribute field to index (e.g. a site number).
+
+    Returns
+    -------
+    keys : 1D numpy array
+        Sorted field values (null values are not indexed)
+    fids : 1D numpy array of ints
+        Feature id for each value in keys
+    """
+    print('building key index for {} in {}...'.format(field, shp))
+    stamp = _dbf_stamp(shp)
+    with _open_collection(shp, columns=[field], geometry=False) as src:
+        field = _match_fields([field], list(src.schema['properties'].keys()))[0]
+        keys, fids = [], []
+        for rec in src:
+            value = rec['properties'][field]
+            if value is not None:
+                keys.append(value)
+                fids.append(int(rec['id']))
+    keys = np.array(keys)
+    if keys.dtype == object:
+        keys = keys.astype(str)
+    fids = np.array(fids, dtype=np.int64)
+    order = np.argsort(keys, kind='mergesort')
+    keys, fids = keys[order], fids[order]
+
+    # write to a temporary file first, so that the index is never partially written
+    outfile = _key_index_path(shp, field)
+    tmpfile = outfile[:-4] + '.tmp.npz'
+    np.savez(tmpfile, keys=keys, fids=fids, stamp=stamp)
+    os.replace(tmpfile, outfile)
+    print('wrote {}'.format(outfile))
+    return keys, fids
+
+
+def _key_index_fids(shp, field, values):
+    """Get the sorted feature ids of features in a shapefile/DBF with
+    values of field in values, using the key index for the field
+    (which is built first if it doesn't exist or the DBF has changed)."""
+    indexfile = _key_index_path(shp, field)
+    keys = None
+    if os.path.exists(indexfile):
+        with np.load(indexfile) as index:
+            if np.array_equal(index['stamp'], _dbf_stamp(shp)):
+                keys, fids = index['keys'], index['fids']
+    if keys is None:
+        keys, fids = build_key_index(shp, field)
+
+    values = np.asarray(list(values))
+    # values can only match keys of the same kind (same as the "in" test in shp2df)
+    if len(values) == 0 or (keys.dtype.kind == 'U') != (values.dtype.kind == 'U'):
+        return np.array([], dtype=np.int64)
+    left = np.searchsorted(keys, values, side='left')
+    right = np.searchsorted(keys, values, side='right')
+    matches = [fids[l:r] for l, r in zip(left, right) if r > l]
+    if len(matches) == 0:
+        return np.array([], dtype=np.int64)
+    return np.unique(np.concatenate(matches))
+
+
 def shp_properties(df):
 
     newdtypes = {'bool': 'str',
@@ -277,54 +1680,76 @@ def shp_properties(df):
     return properties
 
 
-def shpfromdf(df, shpname, Xname, Yname, prj):
+def _points_from_xy(x, y, z=None):
+    """Make an object array of shapely Points from coordinate arrays.
+    Uses the vectorized shapely.points where available (shapely >= 2.0).
+    """
+    coords = [x, y] if z is None else [x, y, z]
+    coords = np.column_stack(coords).astype(float)
+    try:
+        from shapely import points
+        return points(coords)
+    except ImportError:
+        geoms = np.empty(len(coords), dtype=object)
+        geoms[:] = [Point(c) for c in coords]
+        return geoms
+
+
+def _linestrings_from_coords(coords, offsets):
+    """Make an object array of shapely LineStrings from a 2D array of
+    vertex coordinates (one row per vertex, sorted by line),
+    and the offsets of the first vertex of each line (with the number
+    of vertices appended at the end).
+    Uses the vectorized shapely.linestrings where available (shapely >= 2.0).
+    """
+    coords = np.asarray(coords, dtype=float)
+    try:
+        from shapely import linestrings
+        indices = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+        return linestrings(coords, indices=indices)
+    except ImportError:
+        geoms = np.empty(len(offsets) - 1, dtype=object)
+        geoms[:] = [LineString(coords[start:stop])
+                    for start, stop in zip(offsets[:-1], offsets[1:])]
+        return geoms
+
+
+def shpfromdf(df, shpname, Xname, Yname, prj, engine='fiona'):
     '''
     creates point shape file from pandas dataframe
     shp: name of shapefile to write
     Xname: name of column containing Xcoordinates
     Yname: name of column containing Ycoordinates
+    engine: writer to use (see df2shp)
     '''
-    '''
-    # convert dtypes in dataframe to 32 bit
-    i = -1
-    dtypes = list(df.dtypes)
-    for dtype in dtypes:
-        i += 1
-        if dtype == np.dtype('float64'):
-            continue
-            #df[df.columns[i]] = df[df.columns[i]].astype('float32')
-        elif dtype == np.dtype('int64'):
-            df[df.columns[i]] = df[df.columns[i]].astype('int32')
-    # strip dtypes just down to 'float' or 'int'
-    dtypes = [''.join([c for c in d.name if not c.isdigit()]) for d in list(df.dtypes)]
-    # also exchange any 'object' dtype for 'str'
-    dtypes = [d.replace('object', 'str') for d in dtypes]
-
-    properties = dict(zip(df.columns, dtypes))
-    '''
-    properties = shp_properties(df)
-    schema = {'geometry': 'Point', 'properties': properties}
-
-    with fiona.collection(shpname, "w", "ESRI Shapefile", schema) as output:
-        for i in df.index:
-            X = df.iloc[i][Xname]
-            Y = df.iloc[i][Yname]
-            point = Point(X, Y)
-            props = dict(list(zip(df.columns, df.iloc[i])))
-            output.write({'properties': props,
-                          'geometry': mapping(point)})
-    shutil.copyfile(prj, "{}.prj".format(shpname[:-4]))
-
-def csv2points(csv, X='POINT_X', Y='POINT_Y', shpname=None, prj='EPSG:4326', **kwargs):
+    df = df.copy()
+    df['geometry'] = _points_from_xy(df[Xname].values, df[Yname].values)
+    df2shp(df, shpname, prj=prj, engine=engine)
+
+def csv2points(csv, X='POINT_X', Y='POINT_Y', shpname=None, prj='EPSG:4326',
+               chunksize=None, engine='fiona', **kwargs):
     '''
     convert csv with point information to shapefile
+    chunksize: if not None, stream the csv in chunks of chunksize rows,
+        appending each chunk to the shapefile as it is read (so that memory use
+        is bounded by the chunk size, instead of the size of the csv).
+        Column dtypes must be the same in each chunk (e.g. a column of ints
+        with missing values in some chunks); specify them with dtype= if needed.
+    engine: writer to use (see df2shp); 'pyogrio' is much faster for large files
     ``**kwargs``: keyword arguments to pandas read_csv()
     '''
     if not shpname:
         shpname = csv[:-4] + '.shp'
-    df = pd.read_csv(csv, **kwargs)
-    df['geometry'] = [Point(p) for p in zip(df[X], df[Y])]
-    df2shp(df, shpname, geo_column='geometry', prj=prj)
+    if chunksize is None:
+        chunks = [pd.read_csv(csv, **kwargs)]
+    else:
+        chunks = pd.read_csv(csv, chunksize=chunksize, **kwargs)
+    for i, df in enumerate(chunks):
+        df['geometry'] = _points_from_xy(df[X].values, df[Y].values)
+        if i == 0:
+            df2shp(df, shpname, geo_column='geometry', prj=prj, engine=engine)
+        else:
+            df2shp(df, shpname, geo_column='geometry', engine=engine, mode='a')
 
 def xlsx2points(xlsx, sheetname='Sheet1', X='X', Y='Y', shpname=None, prj='EPSG:4326'):
     '''
@@ -333,7 +1758,7 @@ def xlsx2points(xlsx, sheetname='Sheet1', X='X', Y='Y', shpname=None, prj='EPSG:
     if not shpname:
         shpname = xlsx.split('.')[0] + '.shp'
     df = pd.read_excel(xlsx, sheetname)
-    df['geometry'] = [Point(p) for p in zip(df[X], df[Y])]
+    df['geometry'] = _points_from_xy(df[X].values, df[Y].values)
     df2shp(df, shpname, geo_column='geometry', prj=prj)
 
 def pointsdf2shp(dataframe, shpname, X='X', Y='Y', index=False,  prj=None, epsg=None, proj4=None, crs=None):
@@ -343,28 +1768,65 @@ def pointsdf2shp(dataframe, shpname, X='X', Y='Y', index=False,  prj=None, epsg=
     in the dataframe. Note that prj, epsg, etc. get passed along using the same logic as df2shp
     '''
     if 'geometry' not in [k.lower() for k in list(dataframe.keys())]:
-        dataframe['geometry'] = [Point(p) for p in zip(dataframe[X],dataframe[Y])]
-    df2shp(dataframe, shpname, 'geometry', index, prj, epsg, proj4, crs)
+        dataframe['geometry'] = _points_from_xy(dataframe[X].values, dataframe[Y].values)
+    df2shp(dataframe, shpname, 'geometry', index, prj=prj, epsg=epsg, proj4=proj4, crs=crs)
 
 
 def df2shp(dataframe, shpname, geo_column='geometry', index=False,
            retain_order=False,
-           prj=None, epsg=None, proj4=None, crs=None):
+           prj=None, epsg=None, proj4=None, crs=None,
+           engine='fiona', batch_size=100000, mode='w', driver=None):
     '''
     Write a DataFrame to a shapefile
+    (or GeoPackage, FlatGeobuf or GeoParquet file; see driver)
     dataframe: dataframe to write to shapefile
     geo_column: optional column containing geometry to write - default is 'geometry'
+        (shapely geometries or LazyGeometry objects)
     index: If true, write out the dataframe index as a column
     retain_order : boolean
-        Retain column order in dataframe, using an OrderedDict. Shapefile will
-        take about twice as long to write, since OrderedDict output is not
-        supported by the pandas DataFrame object.
+        Retain column order in dataframe. The fields are always written
+        in the order of the DataFrame columns (the field order is set by the schema,
+        which is built from the columns), so this has no effect on write time;
+        kept for backwards compatibility.
 
     --->there are four ways to specify the projection....choose one
-    prj: <file>.prj filename (string)
-    epsg: EPSG identifier (integer)
+    prj: <file>.prj filename (string), EPSG code (e.g. 4326 or 'EPSG:4326'),
+        or pyproj CRS
+    epsg: EPSG identifier (integer); a .prj file is written for it (see get_crs)
     proj4: pyproj style projection string definition
     crs: crs attribute (dictionary) as read by fiona
+
+    engine : {'fiona', 'pyogrio'}
+        Writer to use. 'fiona' (default) converts each row to a record and writes
+        the records one at a time. 'pyogrio' passes the attribute columns and the
+        geometries (as WKB) to OGR in batches, without copying the DataFrame
+        or building records; much faster for large DataFrames (requires pyogrio).
+        Unlike with 'fiona', nulls in text columns are written as nulls (instead of 'None'),
+        and large integers are written as 64-bit integers (instead of text).
+    batch_size : int
+        Number of features written at a time with engine='pyogrio'.
+    mode : {'w', 'a'}
+        'w' (default) writes a new shapefile (overwriting any existing file);
+        'a' appends the features to an existing shapefile (or writes a new one
+        if shpname doesn't exist yet), without rewriting the existing features.
+        The fields (names, order and types) and geometry type of the DataFrame
+        must match those of the existing file, otherwise a ValueError is raised.
+        Successive batches (e.g. from shp2df_chunks) can be appended this way
+        to write a large shapefile in constant memory.
+    driver : str, optional
+        Output format: 'ESRI Shapefile', 'GPKG' (GeoPackage), 'FlatGeobuf'
+        or 'Parquet' (GeoParquet). By default, the format is determined from the
+        extension of shpname (.shp/.dbf, .gpkg, .fgb or .parquet), and is a shapefile
+        if the extension isn't recognized. GeoPackage and FlatGeobuf files are written
+        with a spatial index, and aren't subject to the 2 GB size limit of shapefiles,
+        or the 10 character limit on field names (FlatGeobuf files are sorted
+        spatially by their index, so the features may not be in the order
+        of the DataFrame). With engine='pyogrio', bool and
+        datetime columns are also written as typed fields, instead of strings.
+        GeoParquet files are written with pyarrow (regardless of engine), one row group
+        per batch_size features, with a bounding box column that shp2df uses to skip
+        row groups outside of a filter. Appending isn't supported for GeoParquet
+        or FlatGeobuf files. A prj file is used as the crs for formats other than shapefile.
     '''
     # first check if output path exists
     if os.path.split(shpname)[0] != '' and not os.path.isdir(os.path.split(shpname)[0]):
@@ -374,6 +1836,105 @@ def df2shp(dataframe, shpname, geo_column='geometry', index=False,
     if len(dataframe) == 0:
         raise IndexError("DataFrame is empty!")
 
+    if mode not in ('w', 'a'):
+        raise ValueError("mode must be 'w' or 'a'")
+    if not os.path.exists(shpname):
+        mode = 'w'
+    driver = _get_driver(shpname, driver)
+    if mode == 'a' and driver in ('Parquet', 'FlatGeobuf'):
+        raise ValueError("Appending isn't supported for {} files".format(driver))
+
+    # set projection (or use a prj file, which must be copied after shp is written)
+    # alternatively, provide a crs in dictionary form as read using fiona
+    # from a shapefile like fiona.open(inshpfile).crs
+
+    # prj can also be an EPSG code (e.g. 4326 or 'EPSG:4326'),
+    # or another coordinate system that isn't a file (e.g. a pyproj CRS; see get_crs)
+    if prj is not None and not isinstance(prj, str):
+        if isinstance(prj, (int, np.integer)):
+            epsg = int(prj)
+        else:
+            crs = get_wkt(prj)
+        prj = None
+    elif prj is not None and prj.lower().startswith('epsg:') and not os.path.exists(prj):
+        epsg = int(prj.split(':')[1])
+        prj = None
+
+    if epsg is not None:
+        from fiona.crs import from_epsg
+        crs = from_epsg(int(epsg))
+    elif proj4 is not None:
+        from fiona.crs import from_string
+        crs = from_string(proj4)
+    elif crs is not None:
+        pass
+    else:
+        pass
+
+    # other formats don't have a separate prj file
+    if prj is not None and driver != 'ESRI Shapefile':
+        try:
+            with open(prj) as src:
+                crs = src.read()
+        except IOError:
+            print('Warning: could not find specified prj file. {} will not be projected.'.format(shpname))
+        prj = None
+
+    # pyogrio and pyarrow take the crs as a string
+    if driver == 'Parquet' or engine == 'pyogrio':
+        if epsg is not None:
+            crs = 'EPSG:{}'.format(int(epsg))
+        elif crs is not None and not isinstance(crs, str):
+            from fiona.crs import to_string
+            crs = to_string(crs) or None
+
+    ta = time.time()
+    if driver == 'Parquet':
+        length = _write_geoparquet(dataframe, shpname, geo_column=geo_column,
+                                   index=index, crs=crs, batch_size=batch_size)
+    elif engine == 'pyogrio':
+        length = _write_columnar(dataframe, shpname, geo_column=geo_column,
+                                 index=index, crs=crs, batch_size=batch_size,
+                                 mode=mode, driver=driver)
+    else:
+        length = _write_records(dataframe, shpname, geo_column=geo_column,
+                                index=index, crs=crs, mode=mode, driver=driver)
+    elapsed = time.time() - ta
+    print('wrote {} features in {:.2f}s ({:.0f} features/s)'.format(
+        length, elapsed, length / max(elapsed, 1e-6)))
+
+    # write a prj file for the EPSG code from the local CRS registry (see get_crs)
+    # (fiona writes one from a proj4 string, which loses the datum and projection names)
+    if epsg is not None and driver == 'ESRI Shapefile' and mode == 'w':
+        write_prj(epsg, "{}.prj".format(shpname[:-4]))
+
+    if prj is not None:
+        try:
+            print('copying {} --> {}...'.format(prj, "{}.prj".format(shpname[:-4])))
+            shutil.copyfile(prj, "{}.prj".format(shpname[:-4]))
+        except IOError:
+            print('Warning: could not find specified prj file. shp will not be projected.')
+
+
+def _shp_field_names(columns):
+    """Convert column names to strings, and
+    enforce character limit for names! (otherwise fiona marks it zero)
+    somewhat kludgey, but should work for duplicates up to 99"""
+    newcolumns = list(map(str, columns)) # convert columns to strings in case some are ints
+    overtheline = [(i, '{}{}'.format(c[:8],i)) for i, c in enumerate(newcolumns) if len(c) > 10]
+    for i, c in overtheline:
+        newcolumns[i] = c
+    return newcolumns
+
+
+def _write_records(dataframe, shpname, geo_column='geometry', index=False,
+                   crs=None, mode='w', driver='ESRI Shapefile'):
+    """Write a DataFrame to a shapefile with fiona, one record at a time.
+
+    Returns
+    -------
+    length : number of features written
+    """
     df = dataframe.copy() # make a copy so the supplied dataframe isn't edited
 
     # reassign geometry column if geo_column is special (e.g. something other than "geometry")
@@ -392,38 +1953,18 @@ def df2shp(dataframe, shpname, geo_column='geometry', index=False,
     # retain index as attribute field if index=True
     df.reset_index(inplace=True, drop=not index)
 
-    # enforce character limit for names! (otherwise fiona marks it zero)
-    # somewhat kludgey, but should work for duplicates up to 99
-    df.columns = list(map(str, df.columns)) # convert columns to strings in case some are ints
-    overtheline = [(i, '{}{}'.format(c[:8],i)) for i, c in enumerate(df.columns) if len(c) > 10]
-
-    newcolumns = list(df.columns)
-    for i, c in overtheline:
-        newcolumns[i] = c
-    df.columns = newcolumns
+    if driver == 'ESRI Shapefile':
+        df.columns = _shp_field_names(df.columns)
+    else:
+        df.columns = list(map(str, df.columns))
 
     properties = shp_properties(df)
     del properties['geometry']
 
-    # set projection (or use a prj file, which must be copied after shp is written)
-    # alternatively, provide a crs in dictionary form as read using fiona
-    # from a shapefile like fiona.open(inshpfile).crs
-
-    if epsg is not None:
-        from fiona.crs import from_epsg
-        crs = from_epsg(int(epsg))
-    elif proj4 is not None:
-        from fiona.crs import from_string
-        crs = from_string(proj4)
-    elif crs is not None:
-        pass
-    else:
-        pass
-
     if Type != 'None':
         for g in df.geometry:
             try:
-                Type = g.type
+                Type = '3D ' + g.type if g.has_z else g.type
             except:
                 continue
         mapped = [mapping(g) for g in df.geometry]
@@ -431,34 +1972,205 @@ def df2shp(dataframe, shpname, geo_column='geometry', index=False,
     schema = {'geometry': Type, 'properties': properties}
     length = len(df)
 
-    if not retain_order:
-        props = df.drop('geometry', axis=1).astype(object).to_dict(orient='records')
+    # the field order is set by the schema (an OrderedDict of the DataFrame columns);
+    # fiona sets the record values by field name, so the records don't need to be ordered
+    props = df.drop('geometry', axis=1).astype(object).to_dict(orient='records')
+    if mode == 'a':
+        _check_schema(shpname, schema)
+        print('appending to {}...'.format(shpname))
+        output = fiona.open(shpname, 'a')
     else:
-        props = [OrderedDict(r) for i, r in df.drop('geometry', axis=1).astype(object).iterrows()]
-    print('writing {}...'.format(shpname))
-    with fiona.collection(shpname, "w", driver="ESRI Shapefile", crs=crs, schema=schema) as output:
+        print('writing {}...'.format(shpname))
+        # crs can also be a WKT string (from a prj file)
+        crs_wkt = None
+        if isinstance(crs, str):
+            crs, crs_wkt = None, crs
+        output = fiona.collection(shpname, "w", driver=driver, crs=crs, crs_wkt=crs_wkt,
+                                  schema=schema)
+    with output:
         for i in range(length):
             output.write({'properties': props[i],
                           'geometry': mapped[i]})
+    return length
 
-    if prj is not None:
-        """
-        if 'epsg' in prj.lower():
-            epsg = int(prj.split(':')[1])
-            prjstr = getPRJwkt(epsg).replace('\n', '') # get rid of any EOL
-            ofp = open("{}.prj".format(shpname[:-4]), 'w')
-            ofp.write(prjstr)
-            ofp.close()
-        """
-        try:
-            print('copying {} --> {}...'.format(prj, "{}.prj".format(shpname[:-4])))
-            shutil.copyfile(prj, "{}.prj".format(shpname[:-4]))
-        except IOError:
-            print('Warning: could not find specified prj file. shp will not be projected.')
 
+def _write_columnar(dataframe, shpname, geo_column='geometry', index=False,
+                    crs=None, batch_size=100000, mode='w', driver='ESRI Shapefile'):
+    """Write a DataFrame to a shapefile with pyogrio, passing the attribute
+    fields as numpy arrays and the geometries as WKB, in batches of
+    batch_size features (the first batch creates the shapefile
+    unless mode='a', and subsequent batches are appended to it).
+    The DataFrame isn't copied, and no records are built for the features.
 
+    Returns
+    -------
+    length : number of features written
+    """
+    try:
+        from pyogrio.raw import write
+    except ImportError:
+        raise ImportError('engine="pyogrio" requires pyogrio.')
+
+    columns = [c for c in dataframe.columns if c != geo_column]
+    data = [dataframe[c].values for c in columns]
+    if index:
+        columns = [dataframe.index.name or 'index'] + columns
+        data = [dataframe.index.values] + data
+    shapefile = driver == 'ESRI Shapefile'
+    names = _shp_field_names(columns) if shapefile else list(map(str, columns))
+
+    geoms = None
+    geometry_type = None
+    if geo_column in dataframe.columns:
+        geoms = dataframe[geo_column].values
+        for g in geoms:
+            if g is not None:
+                geometry_type = g.type
+                if g.has_z:
+                    geometry_type += ' Z'
+                break
+
+    if mode == 'a':
+        kinds = {'i': 'int', 'u': 'int', 'f': 'float'}
+        if not shapefile:
+            kinds.update({'b': 'int', 'M': 'datetime'})
+        properties = OrderedDict((n, kinds.get(values.dtype.kind, 'str'))
+                                 for n, values in zip(names, data))
+        Type = 'None'
+        if geometry_type is not None:
+            Type = geometry_type.replace(' Z', '')
+            Type = '3D ' + Type if geometry_type.endswith(' Z') else Type
+        _check_schema(shpname, {'geometry': Type, 'properties': properties})
+        print('appending to {}...'.format(shpname))
+    else:
+        print('writing {}...'.format(shpname))
+
+    length = len(dataframe)
+    for start in range(0, length, batch_size):
+        stop = min(start + batch_size, length)
+        field_data = [_shp_field_values(values[start:stop], typed=not shapefile)
+                      for values in data]
+        wkb = _to_wkb(geoms[start:stop]) if geoms is not None else None
+        write(shpname, wkb, field_data, names, driver=driver,
+              geometry_type=geometry_type, crs=crs,
+              append=mode == 'a' or start > 0)
+    return length
+
+
+def _check_schema(shpname, schema):
+    """Check that a schema (as produced by shp_properties)
+    matches the schema of an existing shapefile, before appending to it.
+    Integers can be appended to float fields, and anything to text fields.
+    Raises a ValueError if the schemas don't match.
+    """
+    with fiona.open(shpname) as src:
+        existing = src.schema
+
+    def base_type(geom_type):
+        return str(geom_type).replace('Multi', '')
+
+    if base_type(schema['geometry']) != base_type(existing['geometry']):
+        raise ValueError("Can't append {} features to {} ({} features)".format(
+            schema['geometry'], shpname, existing['geometry']))
+
+    names = list(schema['properties'].keys())
+    existing_names = list(existing['properties'].keys())
+    if names != existing_names:
+        raise ValueError("Fields {} don't match fields in {}: {}".format(
+            names, shpname, existing_names))
+
+    compatible = {'str': ('int', 'float', 'str', 'date', 'datetime'),
+                  'float': ('int', 'float'),
+                  'datetime': ('date', 'datetime')}
+    for name, dtype in schema['properties'].items():
+        dtype = dtype.split(':')[0]
+        existing_dtype = existing['properties'][name].split(':')[0]
+        if dtype not in compatible.get(existing_dtype, (existing_dtype,)):
+            raise ValueError("Can't append {} values to {} field {} in {}".format(
+                dtype, existing_dtype, name, shpname))
+
+
+def _write_geoparquet(dataframe, filename, geo_column='geometry', index=False,
+                      crs=None, batch_size=100000):
+    """Write a DataFrame to a GeoParquet file with pyarrow, in row groups of
+    batch_size features. The geometries are written as WKB, along with a
+    bounding box column (a GeoParquet 1.1 "covering") whose row group statistics
+    allow readers to skip the row groups outside of a bounding box filter.
 
-def linestring_shpfromdf(df, shpname, IDname, Xname, Yname, Zname, prj, aggregate=None):
+    Returns
+    -------
+    length : number of features written
+    """
+    try:
+        import json
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError('Writing GeoParquet files requires pyarrow.')
+
+    projjson = None
+    if crs is not None:
+        from pyproj import CRS
+        projjson = CRS.from_user_input(crs).to_json_dict()
+    metadata = {'version': '1.1.0', 'primary_column': 'geometry',
+                'columns': {'geometry': {
+                    'encoding': 'WKB', 'geometry_types': [], 'crs': projjson,
+                    'covering': {'bbox': {'xmin': ['bbox', 'xmin'], 'ymin': ['bbox', 'ymin'],
+                                          'xmax': ['bbox', 'xmax'], 'ymax': ['bbox', 'ymax']}}}}}
+
+    # the schema is inferred from the whole frame, so that columns with only
+    # nulls in the first batch get the type of their values in the later ones
+    columns = [c for c in dataframe.columns if c != geo_column]
+    column_schema = pa.Schema.from_pandas(dataframe[columns], preserve_index=False)
+    schema = column_schema
+    if index:
+        index_field = pa.field(str(dataframe.index.name or 'index'),
+                               pa.array(dataframe.index.values).type)
+        schema = schema.insert(0, index_field)
+    bbox_type = pa.struct([(c, pa.float64()) for c in ['xmin', 'ymin', 'xmax', 'ymax']])
+    schema = schema.append(pa.field('geometry', pa.binary()))
+    schema = schema.append(pa.field('bbox', bbox_type))
+    schema_metadata = dict(schema.metadata or {})
+    schema_metadata[b'geo'] = json.dumps(metadata).encode()
+    schema = schema.with_metadata(schema_metadata)
+
+    length = len(dataframe)
+    print('writing {}...'.format(filename))
+    writer = pq.ParquetWriter(filename, schema)
+    for start in range(0, length, batch_size):
+        stop = min(start + batch_size, length)
+        batch = dataframe.iloc[start:stop]
+        table = pa.Table.from_pandas(batch[columns], schema=column_schema,
+                                     preserve_index=False)
+        if index:
+            table = table.add_column(0, index_field,
+                                     pa.array(batch.index.values, type=index_field.type))
+        geoms = batch[geo_column].values
+        bounds = feature_bounds(geoms).astype(float)
+        bbox = pa.StructArray.from_arrays([pa.array(bounds[:, i]) for i in range(4)],
+                                          names=['xmin', 'ymin', 'xmax', 'ymax'])
+        table = table.append_column('geometry', pa.array(_to_wkb(geoms), type=pa.binary()))
+        table = table.append_column('bbox', bbox)
+        writer.write_table(table, row_group_size=batch_size)
+    writer.close()
+    return length
+
+
+def _shp_field_values(values, typed=False):
+    """Convert an array of values to a type that can be written to a shapefile
+    (bool, datetime and object values are written as strings; unless typed=True,
+    for formats with bool and datetime fields)."""
+    kinds = 'iufbM' if typed else 'iuf'
+    if values.dtype.kind in kinds:
+        return values
+    isnull = pd.isnull(values)
+    values = pd.Series(values).astype(str).values.astype(object)
+    values[isnull] = None
+    return values
+
+
+def linestring_shpfromdf(df, shpname, IDname, Xname, Yname, Zname, prj, aggregate=None,
+                         engine='fiona'):
     '''
     creates point shape file from pandas dataframe
     shp: name of shapefile to write
@@ -467,8 +2179,16 @@ def linestring_shpfromdf(df, shpname, IDname, Xname, Yname, Zname, prj, aggregat
     Zname: name of column containing Zcoordinates
     IDname: column with unique integers for each line
     aggregate = dict of column names (keys) and operations (entries)
+    engine: writer to use (see df2shp)
     '''
 
+    # sort once by line (stable, to retain the vertex order within each line)
+    # and get the vertices for each line from the offsets of the line starts
+    df = df.sort_values(IDname, kind='mergesort')
+    ids = df[IDname].astype('int32').values
+    lines, offsets = np.unique(ids, return_index=True)
+    offsets = np.append(offsets, len(ids))
+
     # setup properties for schema
     # if including other properties besides line identifier,
     # aggregate those to single value for line, using supplied aggregate dictionary
@@ -476,31 +2196,202 @@ def linestring_shpfromdf(df, shpname, IDname, Xname, Yname, Zname, prj, aggregat
         cols = [IDname] + list(aggregate.keys())
         aggregated = df[cols].groupby(IDname).agg(aggregate)
         aggregated[IDname] = aggregated.index
-        properties = shp_properties(aggregated)
     # otherwise setup properties to just include line identifier
     else:
-        properties = {IDname: 'int'}
-        aggregated = pd.DataFrame(df[IDname].astype('int32'))
+        aggregated = pd.DataFrame({IDname: lines})
+
+    # lines are in the same (sorted) order as the groupby output
+    aggregated['geometry'] = _linestrings_from_coords(df[[Xname, Yname, Zname]].values, offsets)
+    df2shp(aggregated, shpname, prj=prj, engine=engine)
+
+
+class _RasterSource(object):
+    """Reads windows of one band of a raster, using GDAL if it is installed
+    (otherwise rasterio), so that only the parts of the raster that are needed
+    are read into memory.
+
+    Parameters
+    ----------
+    rasterfile : str
+        Filename of raster.
+    band : int
+        Band to read (1-based).
 
-    schema = {'geometry': '3D LineString', 'properties': properties}
-    lines = list(np.unique(df[IDname].astype('int32')))
+    Attributes
+    ----------
+    nrow, ncol : int
+        Raster dimensions.
+    geotransform : tuple
+        GDAL-style geotransform (xul, dx, rx, yul, ry, dy).
+    block_shape : tuple
+        (rows, columns) of the raster's internal blocks
+        (the smallest unit that is read from disk).
+    nodata : no-data value, or None
+    dtype : numpy dtype of the band
+    projection : str
+        Well-known text of the coordinate reference system.
+    """
+    def __init__(self, rasterfile, band=1):
+        try:
+            from osgeo import gdal
+        except ImportError:
+            try:
+                import gdal
+            except ImportError:
+                gdal = None
+        self.filename = rasterfile
+        self._ds = None
+        self._band = None
+        self._src = None
+        if gdal is not None:
+            from osgeo import gdal_array
+            self._ds = gdal.Open(rasterfile)
+            if self._ds is None:
+                raise IOError("problem reading raster file {}".format(rasterfile))
+            self._band = self._ds.GetRasterBand(band)
+            self.nrow, self.ncol = self._ds.RasterYSize, self._ds.RasterXSize
+            self.geotransform = tuple(self._ds.GetGeoTransform())
+            self.block_shape = tuple(self._band.GetBlockSize()[::-1])
+            self.nodata = self._band.GetNoDataValue()
+            self.dtype = np.dtype(gdal_array.GDALTypeCodeToNumericTypeCode(self._band.DataType))
+            self.projection = self._ds.GetProjection()
+        else:
+            try:
+                import rasterio
+            except ImportError:
+                raise ImportError('Reading rasters requires gdal or rasterio.')
+            self._src = rasterio.open(rasterfile)
+            self._bandnumber = band
+            self.nrow, self.ncol = self._src.height, self._src.width
+            self.geotransform = tuple(self._src.transform.to_gdal())
+            self.block_shape = tuple(self._src.block_shapes[band - 1])
+            self.nodata = self._src.nodatavals[band - 1]
+            self.dtype = np.dtype(self._src.dtypes[band - 1])
+            self.projection = self._src.crs.to_wkt() if self._src.crs is not None else ''
+
+    def read(self, row=0, col=0, nrows=None, ncols=None):
+        """Read a window of nrows x ncols starting at row, col
+        (the whole band by default), in the native dtype."""
+        nrows = self.nrow - row if nrows is None else nrows
+        ncols = self.ncol - col if ncols is None else ncols
+        if self._band is not None:
+            return self._band.ReadAsArray(int(col), int(row), int(ncols), int(nrows))
+        from rasterio.windows import Window
+        return self._src.read(self._bandnumber, window=Window(col, row, ncols, nrows))
+
+    def read_bands(self):
+        """Read all bands of the raster (as with GDAL's Dataset.ReadAsArray):
+        a 2D array for single-band rasters, otherwise (bands, rows, columns)."""
+        if self._ds is not None:
+            return self._ds.ReadAsArray()
+        data = self._src.read()
+        return data[0] if len(data) == 1 else data
+
+    def sample(self, rows, cols):
+        """Get the values of the pixels at rows, cols, reading only the
+        blocks of the raster that contain pixels.
+
+        Returns
+        -------
+        values : 1D numpy array of the native dtype
+        valid : 1D boolean numpy array
+            False for pixels outside of the raster, or with the no-data value.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        values = np.zeros(len(rows), dtype=self.dtype)
+        valid = (rows >= 0) & (rows < self.nrow) & (cols >= 0) & (cols < self.ncol)
+
+        # group the pixels by block, and read each block once
+        bh, bw = self.block_shape
+        nblockcols = int(np.ceil(self.ncol / bw))
+        inside = np.where(valid)[0]
+        keys = (rows[inside] // bh) * nblockcols + cols[inside] // bw
+        order = np.argsort(keys, kind='mergesort')
+        blocks, starts = np.unique(keys[order], return_index=True)
+        for block, group in zip(blocks, np.split(inside[order], starts[1:])):
+            r0, c0 = (block // nblockcols) * bh, (block % nblockcols) * bw
+            data = self.read(r0, c0, min(bh, self.nrow - r0), min(bw, self.ncol - c0))
+            values[group] = data[rows[group] - r0, cols[group] - c0]
+
+        if self.nodata is not None:
+            if np.isnan(self.nodata):
+                valid &= ~np.isnan(values)
+            else:
+                valid &= values != np.array(self.nodata).astype(self.dtype)
+        return values, valid
 
-    with fiona.collection(shpname, "w", "ESRI Shapefile", schema) as output:
-        for line in lines:
+    def close(self):
+        if self._src is not None:
+            self._src.close()
+        self._ds = self._band = self._src = None
 
-            lineinfo = df[df[IDname] == line]
-            vertices = lineinfo[[Xname, Yname, Zname]].values
-            linestring = asLineString(vertices)
-            props = dict(list(zip(aggregated.columns, aggregated.ix[line, :])))
-            output.write({'properties': props,
-                          'geometry': mapping(linestring)})
-    shutil.copyfile(prj, "{}.prj".format(shpname[:-4]))
+    def __enter__(self):
+        return self
 
+    def __exit__(self, *args):
+        self.close()
 
-def get_values_at_points(rasterfile, x=None, y=None):
+
+def _pixel_locations(geotransform, nrow, ncol, x, y, method='nearest'):
+    """Get the pixels to sample for points x, y in a raster grid.
+
+    Returns
+    -------
+    rows, cols : 1D numpy arrays of pixel locations
+        One per point for method='nearest'; with method='bilinear', the four
+        pixels surrounding each point (as four consecutive blocks of npoints).
+    weights : 2D numpy array (4, npoints) of bilinear weights, or None
+    within : 1D boolean array; False for points outside of the raster
+    """
+    xul, dx, rx, yul, ry, dy = geotransform
+    # fractional column, row location of each point
+    j = (x - xul) / dx
+    i = (y - yul) / dy
+    if method == 'nearest':
+        return np.floor(i), np.floor(j), None, None
+    # pixel centers are at half-integer locations;
+    # points within half a pixel of the edge use the edge pixels
+    within = (i >= 0) & (i < nrow) & (j >= 0) & (j < ncol)
+    i0 = np.clip(np.floor(i - 0.5), 0, max(nrow - 2, 0))
+    j0 = np.clip(np.floor(j - 0.5), 0, max(ncol - 2, 0))
+    wi = np.clip(i - 0.5 - i0, 0, 1)
+    wj = np.clip(j - 0.5 - j0, 0, 1)
+    i1 = np.minimum(i0 + 1, nrow - 1)
+    j1 = np.minimum(j0 + 1, ncol - 1)
+    weights = np.array([(1 - wi) * (1 - wj), (1 - wi) * wj, wi * (1 - wj), wi * wj])
+    return (np.concatenate([i0, i0, i1, i1]), np.concatenate([j0, j1, j0, j1]),
+            weights, within)
+
+
+def _sample_locations(src, locations):
+    """Sample a _RasterSource at the pixel locations from _pixel_locations.
+
+    Returns
+    -------
+    results : 1D numpy array (native dtype for nearest; float for bilinear)
+    valid : 1D boolean array
+    """
+    rows, cols, weights, within = locations
+    # (all four bilinear corners are sampled in one pass, so that each block is read once)
+    values, valid = src.sample(rows, cols)
+    if weights is None:
+        return values, valid
+    n = weights.shape[1]
+    values = values.astype(float).reshape(4, n)
+    valid = valid.reshape(4, n).all(axis=0) & within
+    return (values * weights).sum(axis=0), valid
+
+
+def get_values_at_points(rasterfile, x=None, y=None, points=None, band=1,
+                         method='nearest', masked=False):
     """Get raster values single point or list of points.
     Points must be in same coordinate system as raster.
 
+    Only the raster blocks that contain points are read, so that
+    time and memory scale with the number of blocks that are touched,
+    rather than the size of the raster.
+
     Parameters
     ----------
     rasterfile : str
@@ -509,100 +2400,301 @@ def get_values_at_points(rasterfile, x=None, y=None):
         X coordinate locations
     y : 1D array
         Y coordinate locations
-    points : list of tuples or 2D numpy array (npoints, (row, col))
+    points : list of tuples or 2D numpy array (npoints, (x, y))
         Points at which to sample raster.
+    band : int
+        Raster band to sample (1-based).
+    method : {'nearest', 'bilinear'}
+        'nearest' returns the value of the pixel containing each point;
+        'bilinear' interpolates between the centers of the four nearest pixels.
+        With 'bilinear', points next to no-data pixels are treated as no-data.
+    masked : bool
+        If True, return a numpy masked array, with points that are outside
+        of the raster or on no-data pixels masked. Otherwise, these points are nan.
 
     Returns
     -------
-    list of floats
+    values : 1D numpy array
+        With method='nearest', values are in the raster's native dtype
+        (except that integer rasters are returned as float if masked=False
+        and any points are missing). With 'bilinear', values are float.
 
     Notes
     -----
-    requires gdal
+    requires gdal or rasterio
+    Rotated rasters are not supported.
     """
-    try:
-        import gdal
-    except:
-        print('This function requires gdal.')
-
     if x is not None and isinstance(x[0], tuple):
-        x, y = np.squeeze(np.array(x))
+        x, y = np.array(x, dtype=float).T
         warnings.warn(
             "new argument input for get_values_at_points is x, y, or points",
             PendingDeprecationWarning
         )
     elif x is not None:
-        if not isinstance(x, np.ndarray):
-            x = np.array(x)
-        if not isinstance(y, np.ndarray):
-            y = np.ndarray(y)
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
     elif points is not None:
-        if not isinstance(points, np.ndarray):
-            x, y = np.array(points)
-        else:
-            x, y = points[:, 0], points[:, 1]
+        x, y = np.array(points, dtype=float).T
     else:
-        print('Must supply x, y or list/array of points.')
+        raise ValueError('Must supply x, y or list/array of points.')
+    if method not in ('nearest', 'bilinear'):
+        raise ValueError("method must be 'nearest' or 'bilinear'")
 
     t0 = time.time()
-    # open the raster
-    gdata = gdal.Open(rasterfile)
+    print("sampling {} points from {}...".format(len(x), rasterfile))
+    with _RasterSource(rasterfile, band=band) as src:
+        locations = _pixel_locations(src.geotransform, src.nrow, src.ncol,
+                                     x, y, method=method)
+        results, valid = _sample_locations(src, locations)
+
+    if masked:
+        results = np.ma.masked_array(results, mask=~valid)
+    elif not valid.all():
+        if results.dtype.kind != 'f':
+            results = results.astype(float)
+        results[~valid] = np.nan
+    print("finished in {:.2f}s".format(time.time() - t0))
+    return results
 
-    # get the location info
-    xul, dx, rx, yul, ry, dy = gdata.GetGeoTransform()
 
-    # read the array
-    print("reading data from {}...".format(rasterfile))
-    data = gdata.ReadAsArray().astype(np.float)
-    nrow, ncol = data.shape
+def sample_raster_stack(rasterfiles, x=None, y=None, points=None, band=1,
+                        method='nearest', names=None, max_workers=None,
+                        as_dataframe=True):
+    """Sample many rasters at the same point locations.
 
-    print("sampling...")
-    # find the closest row, col location for each point
-    i = ((y - yul) / dy).astype(int)
-    j = ((x - xul) / dx).astype(int)
+    The pixel locations of the points are computed once for each
+    distinct raster grid (origin, cell size and dimensions), and shared by
+    all of the rasters on that grid. Rasters are sampled concurrently
+    in a pool of threads, each reading only the raster blocks that contain points
+    (see get_values_at_points).
 
-    # mask row, col locations outside the raster
-    within = (i > 0) & (i < nrow) & (j > 0) & (j < ncol)
+    Parameters
+    ----------
+    rasterfiles : list of str
+        Filenames of rasters. Points must be in same coordinate system as the rasters.
+    x : 1D array
+        X coordinate locations
+    y : 1D array
+        Y coordinate locations
+    points : list of tuples or 2D numpy array (npoints, (x, y))
+        Points at which to sample the rasters (instead of x, y).
+    band : int
+        Raster band to sample (1-based).
+    method : {'nearest', 'bilinear'}
+        See get_values_at_points.
+    names : list of str, optional
+        Column names for the rasters (by default, the raster filenames).
+    max_workers : int, optional
+        Number of threads (see concurrent.futures.ThreadPoolExecutor).
+    as_dataframe : bool
+        If True (default), return a DataFrame; otherwise a 2D numpy array.
 
-    # get values at valid point locations
-    results = np.ones(len(i), dtype=float) * np.nan
-    results[within] = data[i[within], j[within]]
+    Returns
+    -------
+    values : DataFrame or 2D numpy array (npoints, nrasters)
+        Points that are outside of a raster or on no-data pixels are nan.
+    """
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    if points is not None:
+        x, y = np.array(points, dtype=float).T
+    elif x is None or y is None:
+        raise ValueError('Must supply x, y or list/array of points.')
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if method not in ('nearest', 'bilinear'):
+        raise ValueError("method must be 'nearest' or 'bilinear'")
+
+    # pixel locations for each distinct grid
+    locations = {}
+    lock = threading.Lock()
+
+    def sample(rasterfile):
+        with _RasterSource(rasterfile, band=band) as src:
+            grid = (src.geotransform, src.nrow, src.ncol)
+            with lock:
+                if grid not in locations:
+                    locations[grid] = _pixel_locations(src.geotransform, src.nrow, src.ncol,
+                                                       x, y, method=method)
+            results, valid = _sample_locations(src, locations[grid])
+        results = results.astype(float)
+        results[~valid] = np.nan
+        return results
 
-    print("finished in {:.2f}s".format(time.time() - t0))
-    return results
+    t0 = time.time()
+    print("sampling {} points from {} rasters...".format(len(x), len(rasterfiles)))
+    values = np.empty((len(x), len(rasterfiles)), dtype=float)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for k, results in enumerate(pool.map(sample, rasterfiles)):
+            values[:, k] = results
+    print("finished in {:.2f}s ({} distinct grids)".format(time.time() - t0, len(locations)))
+    if as_dataframe:
+        return pd.DataFrame(values, columns=names if names is not None else list(rasterfiles))
+    return values
+
+
+class RasterHandle(_RasterSource):
+    """Lazy handle on one band of a raster (returned by read_raster(lazy=True)).
+    Nothing is read from the raster until it is needed: windows of the band
+    are read by slicing the handle (or with read()), and uncompressed GeoTIFFs
+    can be memory-mapped (see memmap()). Cell coordinates are available
+    as vectors (x, y) or as a geotransform, instead of full grids.
 
-def read_raster(rasterfile):
+    Parameters
+    ----------
+    rasterfile : str
+        Filename of raster.
+    band : int
+        Band to read (1-based).
+
+    Attributes
+    ----------
+    shape : tuple
+        (nrow, ncol)
+    x : 1D numpy array
+        X coordinates of the cell centers in each column.
+    y : 1D numpy array
+        Y coordinates of the cell centers in each row.
+    geotransform : tuple
+        GDAL-style geotransform (xul, dx, rx, yul, ry, dy).
+    nodata, dtype, projection, block_shape : see _RasterSource
+
+    Examples
+    --------
+    >>> rst = read_raster('dem.tif', lazy=True)
+    >>> window = rst[1000:2000, 500:800]  # masked array of just these cells
+    >>> x, y = rst.x[500:800], rst.y[1000:2000]
+    """
+    @property
+    def shape(self):
+        return self.nrow, self.ncol
+
+    @property
+    def x(self):
+        xul, dx = self.geotransform[:2]
+        return xul + dx * (np.arange(self.ncol) + 0.5)
+
+    @property
+    def y(self):
+        yul, dy = self.geotransform[3], self.geotransform[5]
+        return yul + dy * (np.arange(self.nrow) + 0.5)
+
+    def read(self, row=0, col=0, nrows=None, ncols=None, masked=False):
+        """Read a window of nrows x ncols starting at row, col
+        (the whole band by default), in the native dtype.
+        If masked=True, return a masked array with the no-data values masked."""
+        data = super(RasterHandle, self).read(row, col, nrows, ncols)
+        if masked:
+            data = self.mask(data)
+        return data
+
+    def mask(self, data):
+        """Mask the no-data values in an array read from the raster."""
+        if self.nodata is None:
+            return np.ma.masked_array(data)
+        if np.isnan(self.nodata):
+            return np.ma.masked_invalid(data)
+        return np.ma.masked_equal(data, np.array(self.nodata).astype(self.dtype))
+
+    def __getitem__(self, key):
+        """Read a window by slicing (e.g. rst[100:200, 50:60]),
+        as a masked array. Only the rows and columns in the window are read."""
+        if not isinstance(key, tuple):
+            key = (key, slice(None))
+        windows = []
+        for k, n in zip(key, self.shape):
+            if isinstance(k, (int, np.integer)):
+                k = k + n if k < 0 else k
+                windows.append((k, k + 1, 1, True))
+            else:
+                start, stop, step = k.indices(n)
+                if step < 0:
+                    raise IndexError('negative steps are not supported')
+                windows.append((start, max(stop, start), step, False))
+        (r0, r1, rstep, rint), (c0, c1, cstep, cint) = windows
+        data = self.read(r0, c0, r1 - r0, c1 - c0, masked=True)[::rstep, ::cstep]
+        if rint and cint:
+            return data[0, 0]
+        elif rint:
+            return data[0]
+        elif cint:
+            return data[:, 0]
+        return data
+
+    def memmap(self):
+        """Memory-map the band, if it is stored as one contiguous block of
+        uncompressed pixels (e.g. an uncompressed, striped GeoTIFF),
+        so that the operating system only reads the pages that are used.
+
+        Returns
+        -------
+        data : numpy.memmap (nrow, ncol) (read-only)
+        """
+        if self._band is not None:
+            driver = self._ds.GetDriver().ShortName
+            compression = self._ds.GetMetadataItem('COMPRESSION', 'IMAGE_STRUCTURE')
+
+            def tiff_item(name):
+                return self._band.GetMetadataItem(name, 'TIFF')
+        else:
+            driver = self._src.driver
+            compression = self._src.compression
+
+            def tiff_item(name):
+                return self._src.get_tag_item(name, 'TIFF', bidx=self._bandnumber)
+        bh, bw = self.block_shape
+        nblocks = int(np.ceil(self.nrow / bh))
+        itemsize = self.dtype.itemsize
+        if driver != 'GTiff' or compression is not None or bw != self.ncol:
+            raise ValueError('{} is not an uncompressed, striped GeoTIFF; '
+                             'use read() or slicing instead'.format(self.filename))
+        offset = int(tiff_item('BLOCK_OFFSET_0_0'))
+        last = int(tiff_item('BLOCK_OFFSET_0_{}'.format(nblocks - 1)))
+        if last != offset + (nblocks - 1) * bh * bw * itemsize:
+            raise ValueError('{} is not stored contiguously; '
+                             'use read() or slicing instead'.format(self.filename))
+        with open(self.filename, 'rb') as src:
+            byteorder = '<' if src.read(2) == b'II' else '>'
+        return np.memmap(self.filename, dtype=self.dtype.newbyteorder(byteorder), mode='r',
+                         offset=offset, shape=(self.nrow, self.ncol))
+
+
+def read_raster(rasterfile, lazy=False, band=None):
     '''
     reads a GDAL raster into numpy array for plotting
     also returns meshgrid of x and y coordinates of each cell for plotting
     based on code stolen from:
     http://stackoverflow.com/questions/20488765/plot-gdal-raster-using-matplotlib-basemap 
+
+    if lazy=True, returns a RasterHandle instead, which only reads the parts
+    of the raster that are used (as windows, or through a memory map), and has
+    coordinate vectors (x, y) and a geotransform instead of full coordinate grids,
+    and no-data values masked instead of set to zero.
+
+    band: band to read (1-based); by default all bands are read
+    (a 3D array of bands, rows, columns for multiband rasters),
+    or band 1 if lazy=True.
     '''
-    try:
-        import gdal
-    except:
-        print('This function requires gdal.')
-    try:
-        ds = gdal.Open(rasterfile)
-    except:
-        raise IOError("problem reading raster file {}".format(rasterfile))
-
-    print('\nreading in {} into numpy array...'.format(rasterfile))
-    data = ds.ReadAsArray()
-    gt = ds.GetGeoTransform()
-    proj = ds.GetProjection()
-    
+    if lazy:
+        return RasterHandle(rasterfile, band=band or 1)
+
+    with RasterHandle(rasterfile, band=band or 1) as ds:
+        print('\nreading in {} into numpy array...'.format(rasterfile))
+        data = ds.read_bands() if band is None else ds.read()
+        gt = ds.geotransform
+        proj = ds.projection
+        nrow, ncol = ds.shape
+
     xres = gt[1]
     yres = gt[5]
     
     # get the edge coordinates and add half the resolution 
     # to go to center coordinates
     xmin = gt[0] + xres * 0.5
-    xmax = gt[0] + (xres * ds.RasterXSize) - xres * 0.5
-    ymin = gt[3] + (yres * ds.RasterYSize) + yres * 0.5
+    xmax = gt[0] + (xres * ncol) - xres * 0.5
+    ymin = gt[3] + (yres * nrow) + yres * 0.5
     ymax = gt[3] + yres * 0.5
-    
-    del ds
 
     print('creating a grid of xy coordinates in the original projection...')
     xy = np.mgrid[xmin:xmax+xres:xres, ymax+yres:ymin:yres]
@@ -619,14 +2711,15 @@ def flatten_3Dshp(shp, outshape=None):
 	
 	df = shp2df(shp, geometry=True)
 	
-	# somehow this removes 3D formatting
-	df['2D'] = df['geometry'].map(lambda x: loads(x.wkt))
+	# drop the z coordinates
+	from shapely.ops import transform
+	df['2D'] = df['geometry'].map(lambda x: transform(lambda x, y, z=None: (x, y), x))
 	
 	# drop the original geometry column
 	df = df.drop('geometry', axis=1)
 	
 	# poop it back out
-	df2shp(df, outshape, '2D', shp[:-4]+'.prj')
+	df2shp(df, outshape, '2D', prj=shp[:-4]+'.prj')
 	
 def _is_None(value):
     if isinstance(value, str) and value.lower() == 'none':
@@ -637,16 +2730,25 @@ def _is_None(value):
         return False
 
 def arc_ascii(array, filename, xll=0, yll=0, cellsize=1.,
-              nodata=-9999, **kwargs):
+              nodata=-9999, fmt=None, delimiter=' ', chunksize=1000, **kwargs):
     """Write numpy array to Arc Ascii grid.
 
+    The array is written in blocks of chunksize rows. By default (fmt=None),
+    each block is formatted by the pyarrow CSV writer (in C++), using the
+    shortest representation of each value that reads back to the same number;
+    about twice as fast as np.savetxt for a 2000 x 2000 float grid.
+    Otherwise (or if pyarrow isn't installed), each block is written with np.savetxt.
+
     Parameters
     ----------
-    kwargs: keyword arguments to np.savetxt
+    fmt : str, optional
+        Format for the values (as in np.savetxt), e.g. '%.6f'.
+    delimiter : str
+        String separating values in a row.
+    chunksize : int
+        Number of rows to format and write at a time.
+    kwargs: other keyword arguments to np.savetxt
     """
-    array = array.copy()
-    array[np.isnan(array)] = nodata
-
     filename = '.'.join(filename.split('.')[:-1]) + '.asc'  # enforce .asc ending
     nrow, ncol = array.shape
     txt = 'ncols  {:d}\n'.format(ncol)
@@ -655,8 +2757,157 @@ def arc_ascii(array, filename, xll=0, yll=0, cellsize=1.,
     txt += 'yllcorner  {:f}\n'.format(yll)
     txt += 'cellsize  {}\n'.format(cellsize)
     txt += 'NODATA_value  {:.0f}\n'.format(nodata)
-    with open(filename, 'w') as output:
-        output.write(txt)
-    with open(filename, 'ab') as output:
-        np.savetxt(output, array, **kwargs)
-    print('wrote {}'.format(filename))
\ No newline at end of file
+    pcsv = None
+    if fmt is None and len(kwargs) == 0:
+        try:
+            import pyarrow as pa
+            import pyarrow.csv as pcsv
+            options = pcsv.WriteOptions(include_header=False, delimiter=delimiter,
+                                        quoting_style='none')
+        except ImportError:
+            pass
+    if fmt is None:
+        fmt = '%.17g'
+    names = [str(j) for j in range(ncol)]
+    with open(filename, 'wb') as output:
+        output.write(txt.encode())
+        for start in range(0, nrow, chunksize):
+            block = array[start:start + chunksize]
+            if block.dtype.kind == 'f':
+                block = np.where(np.isnan(block), nodata, block)
+            if pcsv is not None:
+                # (columns are contiguous in the transpose)
+                block = np.ascontiguousarray(block.T)
+                table = pa.Table.from_arrays([pa.array(c) for c in block], names=names)
+                pcsv.write_csv(table, output, options)
+            else:
+                np.savetxt(output, block, fmt=fmt, delimiter=delimiter, **kwargs)
+    print('wrote {}'.format(filename))
+
+
+def read_arc_ascii(filename, out=None, dtype=float, nodata_to_nan=True,
+                   chunksize=2**24):
+    """Read an Arc Ascii grid into a numpy array.
+
+    The values are parsed in blocks of rows (of about chunksize bytes of text)
+    by the pyarrow CSV reader (in C++), and copied into the output array; about
+    2.5 times as fast as np.loadtxt for a 2000 x 2000 float grid. Grids that don't have
+    one line of single-space delimited values per row (or if pyarrow isn't installed)
+    are parsed in blocks of text as a sequence of values with np.fromstring.
+
+    Parameters
+    ----------
+    filename : str
+        Arc Ascii grid file.
+    out : numpy array or str, optional
+        Array of shape (nrows, ncols) to read the values into (e.g. a preallocated
+        array or numpy.memmap); or a filename, to read the values into a new
+        memory-mapped .npy file (see numpy.lib.format.open_memmap).
+    dtype : numpy dtype
+        dtype of the output array (if out is not an array).
+    nodata_to_nan : bool
+        If True (default), no-data values are converted to nan (for float output).
+    chunksize : int
+        Approximate number of bytes of text to parse at a time.
+
+    Returns
+    -------
+    array : 2D numpy array (nrows, ncols)
+    info : dict
+        Header values (ncols, nrows, xllcorner or xllcenter, yllcorner or yllcenter,
+        cellsize, nodata_value), with lowercase keys.
+    """
+    info = {}
+    with open(filename) as src:
+        # header lines start with a keyword
+        while True:
+            pos = src.tell()
+            line = src.readline()
+            items = line.split()
+            if len(items) != 2 or not items[0][0].isalpha():
+                src.seek(pos)
+                break
+            info[items[0].lower()] = float(items[1])
+        nrow, ncol = int(info['nrows']), int(info['ncols'])
+        for k in 'nrows', 'ncols':
+            info[k] = int(info[k])
+
+        if out is None:
+            out = np.empty((nrow, ncol), dtype=dtype)
+        elif isinstance(out, str):
+            out = np.lib.format.open_memmap(out, mode='w+', dtype=dtype, shape=(nrow, ncol))
+        elif out.shape != (nrow, ncol) or not out.flags.c_contiguous:
+            raise ValueError('out should be a C-contiguous array of shape {}'.format((nrow, ncol)))
+        flat = out.reshape(-1)
+        data_start = src.tell()
+
+        try:
+            n = _read_arc_ascii_rows(filename, len(info), out, chunksize)
+        except (ImportError, ValueError):
+            # parse blocks of text as any whitespace-delimited sequence of values
+            src.seek(data_start)
+            n = _read_arc_ascii_values(src, flat, chunksize)
+    if n != nrow * ncol:
+        raise ValueError('{} has {} values; should be {}'.format(filename, n, nrow * ncol))
+
+    nodata = info.get('nodata_value')
+    if nodata_to_nan and nodata is not None and out.dtype.kind == 'f':
+        out[out == nodata] = np.nan
+    return out, info
+
+
+def _read_arc_ascii_rows(filename, skip_rows, out, chunksize=2**24):
+    """Parse the rows of values in an Arc Ascii grid into the 2D array out,
+    with the pyarrow CSV reader, in blocks of about chunksize bytes.
+    Returns the number of values read. Raises ValueError for files
+    that don't have one line of single-space delimited values per row."""
+    import pyarrow as pa
+    import pyarrow.csv as pcsv
+    nrow, ncol = out.shape
+    names = ['f{}'.format(j) for j in range(ncol)]
+    try:
+        reader = pcsv.open_csv(filename,
+                               read_options=pcsv.ReadOptions(skip_rows=skip_rows,
+                                                             autogenerate_column_names=True,
+                                                             block_size=chunksize),
+                               parse_options=pcsv.ParseOptions(delimiter=' '),
+                               # (empty fields from repeated spaces are an error, rather than nulls)
+                               convert_options=pcsv.ConvertOptions(
+                                   column_types={name: pa.float64() for name in names},
+                                   include_columns=names, null_values=[]))
+        n = 0
+        for batch in reader:
+            if n + batch.num_rows > nrow:
+                raise ValueError('more rows than nrows')
+            for j, column in enumerate(batch.columns):
+                out[n:n + batch.num_rows, j] = column.to_numpy(zero_copy_only=False)
+            n += batch.num_rows
+    except pa.ArrowException as e:
+        raise ValueError(str(e))
+    return n * ncol
+
+
+def _read_arc_ascii_values(src, flat, chunksize=2**24):
+    """Parse whitespace-delimited values from an open text file into the 1D array flat,
+    in blocks of about chunksize bytes. Returns the number of values read."""
+    n = 0
+    remainder = ''
+    while True:
+        text = src.read(chunksize)
+        if not text:
+            break
+        # don't split a value between chunks
+        text = remainder + text
+        end = max(text.rfind(c) for c in ' \n\t\r')
+        if end < 0:
+            remainder = text
+            continue
+        text, remainder = text[:end], text[end:]
+        values = np.fromstring(text, sep=' ')
+        flat[n:n + len(values)] = values
+        n += len(values)
+    if remainder.strip():
+        values = np.fromstring(remainder, sep=' ')
+        flat[n:n + len(values)] = values
+        n += len(values)
+    return n
@@ -4,14 +4,15 @@ from __future__ import print_function
 import warnings
 warnings.filterwarnings('ignore', category=UserWarning)
 import collections
+import collections.abc
 import os
+import threading
 import time
 import numpy as np
 import fiona
 from shapely.geometry import Point, LineString, shape, asLineString, mapping
 from shapely import affinity
 from shapely.ops import unary_union, transform
-from functools import partial
 import pyproj
 import pandas as pd
 import shutil
@@ -235,33 +236,339 @@ def merge_rasters(inrasters, outfile):
         dest.write(out_image)
     print('wrote {}'.format(outfile))
 
-def projectdf(df, projection1, projection2):
+class TransformerCache(object):
+    """Thread-safe LRU cache of pyproj Transformer objects, keyed by the
+    (normalized) pair of source and destination coordinate reference systems,
+    so that repeated reprojections with the same pair of coordinate systems
+    don't pay the cost of setting up the transformation each time.
+    The CRS objects are resolved (and cached) with GISio.get_crs.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of transformers to keep.
+
+    Attributes
+    ----------
+    hits, misses : int
+        Number of lookups that were found in the cache, or created a new transformer.
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._transformers = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, projection1, projection2):
+        """Get a Transformer from projection1 to projection2
+        (EPSG codes, proj4 strings, WKT, .prj files or fiona crs dicts;
+        see GISio.get_crs). Coordinates are in x, y (lon, lat) order,
+        in the units of each coordinate system."""
+        key = (GISio._crs_key(projection1), GISio._crs_key(projection2))
+        with self._lock:
+            transformer = self._transformers.get(key)
+            if transformer is not None:
+                self._transformers.move_to_end(key)
+                self.hits += 1
+                return transformer
+            self.misses += 1
+        transformer = pyproj.Transformer.from_crs(GISio._cached_crs(key[0]),
+                                                  GISio._cached_crs(key[1]),
+                                                  always_xy=True)
+        with self._lock:
+            self._transformers[key] = transformer
+            while len(self._transformers) > self.maxsize:
+                self._transformers.popitem(last=False)
+        return transformer
+
+    def cache_info(self):
+        """Dictionary of hits, misses and current size of the cache."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self._transformers), 'maxsize': self.maxsize}
+
+    def clear(self):
+        with self._lock:
+            self._transformers.clear()
+            self.hits = self.misses = 0
+
+
+# shared by the projection functions below
+transformer_cache = TransformerCache()
+
+
+def get_transformer(projection1, projection2):
+    """Get a (cached) pyproj Transformer from projection1 to projection2
+    (see TransformerCache)."""
+    return transformer_cache.get(projection1, projection2)
+
+
+def _transform_arrays(transformer, x, y, z=None, chunksize=None):
+    """Transform coordinate arrays with a pyproj Transformer,
+    in chunks of chunksize coordinates (all at once if None)."""
+    coords = [x, y] if z is None else [x, y, z]
+    coords = [np.asarray(c, dtype=float) for c in coords]
+    n = len(coords[0])
+    if chunksize is None or n <= chunksize:
+        return tuple(np.asarray(c) for c in transformer.transform(*coords))
+    out = [np.empty(n) for c in coords]
+    for start in range(0, n, chunksize):
+        chunk = slice(start, start + chunksize)
+        for o, c in zip(out, transformer.transform(*[c[chunk] for c in coords])):
+            o[chunk] = c
+    return tuple(out)
+
+
+def _coord_sequences(coords):
+    """Yield the coordinate sequences in nested GeoJSON coordinates
+    (a single position is yielded as a sequence of one)."""
+    if len(coords) == 0:
+        return
+    if np.isscalar(coords[0]):
+        yield [coords]
+    elif len(coords[0]) > 0 and np.isscalar(coords[0][0]):
+        yield coords
+    else:
+        for c in coords:
+            for seq in _coord_sequences(c):
+                yield seq
+
+
+def _replace_coord_sequences(coords, sequences):
+    """Rebuild nested GeoJSON coordinates, taking each coordinate sequence
+    in turn from the iterator sequences (the inverse of _coord_sequences)."""
+    if len(coords) == 0:
+        return coords
+    if np.isscalar(coords[0]):
+        return tuple(next(sequences)[0])
+    elif len(coords[0]) > 0 and np.isscalar(coords[0][0]):
+        return next(sequences)
+    return [_replace_coord_sequences(c, sequences) for c in coords]
+
+
+def _geometry_sequences(geom):
+    """Coordinate sequences in a GeoJSON geometry mapping (None for null geometries)."""
+    if geom is None:
+        return []
+    if geom['type'] == 'GeometryCollection':
+        return [seq for g in geom['geometries'] for seq in _geometry_sequences(g)]
+    return list(_coord_sequences(geom['coordinates']))
+
+
+def _replace_geometry_sequences(geom, sequences):
+    if geom is None:
+        return None
+    if geom['type'] == 'GeometryCollection':
+        return {'type': geom['type'],
+                'geometries': [_replace_geometry_sequences(g, sequences)
+                               for g in geom['geometries']]}
+    return {'type': geom['type'],
+            'coordinates': _replace_coord_sequences(geom['coordinates'], sequences)}
+
+
+def _transform_sequences(sequences, transformer, chunksize=1000000):
+    """Transform a list of coordinate sequences ((x, y) or (x, y, z) positions)
+    in bulk: the sequences are concatenated into contiguous arrays
+    (one for 2D and one for 3D coordinates), transformed with a few
+    vectorized calls to the transformer, and split back up by their lengths.
+    Returns a list of 2D arrays (n positions, n dimensions)."""
+    sequences = [np.asarray(seq, dtype=float) for seq in sequences]
+    lengths = np.array([len(seq) for seq in sequences], dtype=int)
+    ndims = np.array([seq.shape[1] for seq in sequences], dtype=int)
+    transformed = [None] * len(sequences)
+    for ndim in np.unique(ndims):
+        seqs = np.where(ndims == ndim)[0]
+        positions = np.concatenate([sequences[i] for i in seqs])
+        z = positions[:, 2] if ndim > 2 else None
+        result = np.column_stack(_transform_arrays(transformer, positions[:, 0],
+                                                   positions[:, 1], z,
+                                                   chunksize=chunksize))
+        for i, seq in zip(seqs, np.split(result, np.cumsum(lengths[seqs])[:-1])):
+            transformed[i] = seq
+    return transformed
+
+
+def _transform_mappings(geoms, transformer, chunksize=1000000):
+    """Reproject a sequence of GeoJSON geometry mappings in bulk
+    (see _transform_sequences).
+
+    Returns
+    -------
+    geoms : list of new GeoJSON geometry mappings
+    """
+    geoms = list(geoms)
+    sequences = [seq for g in geoms for seq in _geometry_sequences(g)]
+    transformed = iter(_transform_sequences(sequences, transformer, chunksize=chunksize))
+    return [_replace_geometry_sequences(g, transformed) for g in geoms]
+
+
+def _shapely_sequences(geom):
+    """Coordinate sequences in a shapely geometry (of any type)."""
+    if geom.is_empty:
+        return []
+    if hasattr(geom, 'geoms'):
+        return [seq for g in geom.geoms for seq in _shapely_sequences(g)]
+    if geom.geom_type == 'Polygon':
+        return [geom.exterior.coords] + [r.coords for r in geom.interiors]
+    return [geom.coords]
+
+
+def _replace_shapely_sequences(geom, sequences):
+    """Rebuild a shapely geometry, taking each coordinate sequence
+    in turn from the iterator sequences (the inverse of _shapely_sequences)."""
+    if geom.is_empty:
+        return geom
+    if hasattr(geom, 'geoms'):
+        return type(geom)([_replace_shapely_sequences(g, sequences) for g in geom.geoms])
+    if geom.geom_type == 'Polygon':
+        return type(geom)(next(sequences), [next(sequences) for r in geom.interiors])
+    if geom.geom_type == 'Point':
+        return type(geom)(next(sequences)[0])
+    return type(geom)(next(sequences))
+
+
+def _transform_geometries(geoms, transformer, chunksize=1000000):
+    """Reproject a sequence of shapely geometries (or GISio.LazyGeometry objects)
+    in bulk (see _transform_sequences). Uses the vectorized
+    shapely.get/set_coordinates where available (shapely >= 2.0).
+    Null and empty geometries are returned as is.
+    """
+    geoms = [_to_shapely(g, cache=False) for g in geoms]
+    valid = np.array([g is not None and not g.is_empty for g in geoms], dtype=bool)
+    # (assigned one at a time, so that numpy doesn't try to unpack the geometries)
+    geoms, _geoms = np.empty(len(geoms), dtype=object), geoms
+    for i, g in enumerate(_geoms):
+        geoms[i] = g
+    newgeo = geoms.copy()
+    try:
+        from shapely import get_coordinates, set_coordinates, has_z
+        for is3d in (False, True):
+            subset = valid & (has_z(geoms) == is3d)
+            if not subset.any():
+                continue
+            coords = get_coordinates(geoms[subset], include_z=is3d)
+            coords = np.column_stack(_transform_arrays(transformer, *coords.T,
+                                                       chunksize=chunksize))
+            newgeo[subset] = set_coordinates(geoms[subset].copy(), coords)
+    except ImportError:
+        sequences = [seq for g in geoms[valid] for seq in _shapely_sequences(g)]
+        transformed = iter(_transform_sequences(sequences, transformer, chunksize=chunksize))
+        for i in np.where(valid)[0]:
+            newgeo[i] = _replace_shapely_sequences(geoms[i], transformed)
+    return newgeo
+
+
+# transformers for use on worker threads (one per thread and pair of coordinate systems)
+_thread_transformers = threading.local()
+
+# long-lived thread pools for _transform_xy_threaded (by max_workers), so that
+# the worker threads, and their transformers, are reused from call to call
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _get_executor(max_workers=None):
+    from concurrent.futures import ThreadPoolExecutor
+    with _executors_lock:
+        executor = _executors.get(max_workers)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+            _executors[max_workers] = executor
+        return executor
+
+
+def _local_transformer(projection1, projection2):
+    """Get a Transformer for the current thread (from _thread_transformers)."""
+    transformers = getattr(_thread_transformers, 'transformers', None)
+    if transformers is None:
+        transformers = _thread_transformers.transformers = {}
+    key = (GISio._crs_key(projection1), GISio._crs_key(projection2))
+    transformer = transformers.get(key)
+    if transformer is None:
+        transformer = pyproj.Transformer.from_crs(GISio._cached_crs(key[0]),
+                                                  GISio._cached_crs(key[1]),
+                                                  always_xy=True)
+        transformers[key] = transformer
+    return transformer
+
+
+def _transform_into(transformer, x, y, xout, yout):
+    """Transform x and y with transformer into the arrays xout, yout
+    (in place, if they are contiguous float arrays)."""
+    if all(a.dtype == np.float64 and a.flags.c_contiguous and a.flags.writeable
+           for a in (xout, yout)):
+        xout[:] = x
+        yout[:] = y
+        transformer.transform(xout, yout, inplace=True)
+    else:
+        xout[:], yout[:] = transformer.transform(x, y)
+
+
+def _transform_xy_threaded(x, y, projection1, projection2, out=None,
+                           chunksize=1000000, max_workers=None):
+    """Transform x and y coordinate arrays in chunks of chunksize coordinates,
+    on a pool of max_workers threads (pyproj releases the GIL while transforming).
+    Each thread uses its own Transformer. The results are written into
+    the (preallocated) output arrays in out, in place where possible.
+    Arrays of up to chunksize coordinates are transformed on the calling thread,
+    with the shared transformer (see get_transformer).
+
+    Returns
+    -------
+    xout, yout : 1-D float arrays
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if out is None:
+        out = np.empty(len(x)), np.empty(len(y))
+    xout, yout = out
+
+    if len(x) <= chunksize:
+        _transform_into(get_transformer(projection1, projection2), x, y, xout, yout)
+        return xout, yout
+
+    def transform_chunk(start):
+        chunk = slice(start, start + chunksize)
+        _transform_into(_local_transformer(projection1, projection2),
+                        x[chunk], y[chunk], xout[chunk], yout[chunk])
+
+    list(_get_executor(max_workers).map(transform_chunk, range(0, len(x), chunksize)))
+    return xout, yout
+
+
+def projectdf(df, projection1, projection2, engine='vectorized', chunksize=1000000):
     """Reproject a dataframe's geometry column to new coordinate system
 
     Parameters
     ----------
     df: dataframe
         Contains "geometry" column of shapely geometries
+        (or GISio.LazyGeometry objects, which are decoded one at a time)
 
     projection1: string
         Proj4 string specifying source projection
     projection2: string
         Proj4 string specifying destination projection
+    engine: str, 'vectorized' or 'shapely'
+        'vectorized' (default) flattens the coordinates of all of the geometries
+        into arrays, which are transformed with a few calls to pyproj
+        (chunksize coordinates at a time), and rebuilds the geometries.
+        'shapely' transforms each geometry with shapely.ops.transform.
+        The results are the same.
+    chunksize: int
+        Maximum number of coordinates to transform at once, with engine='vectorized'.
     """
-    projection1 = str(projection1)
-    projection2 = str(projection2)
-
+    # projection function (from the shared transformer cache)
+    transformer = get_transformer(projection1, projection2)
 
-    # define projections
-    pr1 = pyproj.Proj(projection1, errcheck=True, preserve_units=True)
-    pr2 = pyproj.Proj(projection2, errcheck=True, preserve_units=True)
-
-    # projection function
-    # (see http://toblerity.org/shapely/shapely.html#module-shapely.ops)
-    project = partial(pyproj.transform, pr1, pr2)
+    if engine == 'vectorized':
+        return list(_transform_geometries(df.geometry, transformer, chunksize=chunksize))
 
     # do the transformation!
-    newgeo = [transform(project, g) for g in df.geometry]
+    # (see http://toblerity.org/shapely/shapely.html#module-shapely.ops)
+    newgeo = [transform(transformer.transform, _to_shapely(g, cache=False))
+              for g in df.geometry]
 
     return newgeo
 
@@ -281,7 +588,7 @@ def project(geom, projection1, projection2):
     if isinstance(geom, tuple):
         return np.squeeze([projectXY(geom[0], geom[1], projection1, projection2)])
 
-    if isinstance(geom, collections.Iterable):
+    if isinstance(geom, collections.abc.Iterable):
         geom = list(geom) # in case it's a generator
         geom0 = geom[0]
     else:
@@ -294,24 +601,17 @@ def project(geom, projection1, projection2):
         return np.squeeze([projectXY(x, y, projection1, projection2)])
 
     # transform shapely objects
-    # enforce strings
-    projection1 = str(projection1)
-    projection2 = str(projection2)
-
-    # define projections
-    pr1 = pyproj.Proj(projection1, errcheck=True, preserve_units=True)
-    pr2 = pyproj.Proj(projection2, errcheck=True, preserve_units=True)
-
-    # projection function
+    # projection function (from the shared transformer cache)
     # (see http://toblerity.org/shapely/shapely.html#module-shapely.ops)
-    project = partial(pyproj.transform, pr1, pr2)
+    project = get_transformer(projection1, projection2).transform
 
     # do the transformation!
-    if isinstance(geom, collections.Iterable):
+    if isinstance(geom, collections.abc.Iterable):
         return [transform(project, g) for g in geom]
     return transform(project, geom)
 
-def projectXY(x, y, projection1, projection2):
+def projectXY(x, y, projection1, projection2, out=None,
+              chunksize=1000000, max_workers=None):
     """Project x and y coordinates to different crs
     
     Parameters
@@ -322,15 +622,23 @@ def projectXY(x, y, projection1, projection2):
         Proj4 string specifying source projection
     projection2: string
         Proj4 string specifying destination projection
-    """
-    projection1 = str(projection1)
-    projection2 = str(projection2)
-
-    # define projections
-    pr1 = pyproj.Proj(projection1, errcheck=True, preserve_units=True)
-    pr2 = pyproj.Proj(projection2, errcheck=True, preserve_units=True)
+    out: tuple of two 1-D float arrays, optional
+        Preallocated arrays for the projected x and y coordinates.
+    chunksize: int
+        Arrays longer than chunksize (or written to out) are projected
+        in chunks of chunksize coordinates, on a pool of threads.
+    max_workers: int, optional
+        Number of threads to use (see concurrent.futures.ThreadPoolExecutor).
 
-    return pyproj.transform(pr1, pr2, x, y)
+    Returns
+    -------
+    x, y : projected coordinates
+        (1-D float arrays if the coordinates were projected in chunks)
+    """
+    if out is not None or (np.ndim(x) > 0 and len(x) > chunksize):
+        return _transform_xy_threaded(x, y, projection1, projection2, out=out,
+                                      chunksize=chunksize, max_workers=max_workers)
+    return get_transformer(projection1, projection2).transform(x, y)
 
 
 def project_raster(src_raster, dst_raster, dst_crs,
@@ -410,23 +718,34 @@ def build_rtree_index(geom):
 
     Parameters
     ==========
-    geom : list
-        list of shapely geometry objects
+    geom : list or str
+        list of shapely geometry objects (or GISio.LazyGeometry objects),
+        or a shapefile, in which case the persistent spatial index for the shapefile
+        is returned (see GISio.load_spatial_index), with the feature ids as indices.
+        (its intersection() method returns feature ids; to intersect the features,
+        pass the shapefile to intersect_rtree)
     Returns
         idx : rtree spatial index object
     """
+    if isinstance(geom, str):
+        return GISio.load_spatial_index(geom)
+
     from rtree import index
 
     # build spatial index for items in geom1
     print('\nBuilding spatial index...')
     ta = time.time()
     idx = index.Index()
-    for i, g in enumerate(geom):
-        idx.insert(i, g.bounds)
+    # (the bounds are computed without decoding LazyGeometry objects where possible)
+    bounds = GISio.feature_bounds(geom)
+    for i, b in enumerate(bounds):
+        if not np.isnan(b).any():
+            idx.insert(i, tuple(b))
     print("finished in {:.2f}s".format(time.time() - ta))
     return idx
 
-def projectdf_XY(df, xcolin, ycolin, xcoltrans, ycoltrans, projection1, projection2):
+def projectdf_XY(df, xcolin, ycolin, xcoltrans, ycoltrans, projection1, projection2,
+                 chunksize=1000000, max_workers=None):
     """
 
     :param df: dataframe containing X and Y data to transform. NB - new columns will be written in place!
@@ -436,19 +755,118 @@ def projectdf_XY(df, xcolin, ycolin, xcoltrans, ycoltrans, projection1, projecti
     :param ycoltrans: column of df THAT WILL BE WRITTEN with Y projected to projection2
     :param projection1: (string) Proj4 string specifying source projection
     :param projection2: (string) Proj4 string specifying destination projection
+    :param chunksize: (int) number of coordinates to project at a time, on each thread
+    :param max_workers: (int) number of threads to use (see projectXY)
     """
-    projection1 = str(projection1)
-    projection2 = str(projection2)
+    # the coordinates are read from the column buffers (without copies for float columns),
+    # and projected into new arrays that become the output columns
+    x = df[xcolin].to_numpy(dtype=float)
+    y = df[ycolin].to_numpy(dtype=float)
+    xout, yout = projectXY(x, y, projection1, projection2,
+                           out=(np.empty(len(df)), np.empty(len(df))),
+                           chunksize=chunksize, max_workers=max_workers)
+    df[xcoltrans] = xout
+    df[ycoltrans] = yout
 
-    # define projections
-    pr1 = pyproj.Proj(projection1, errcheck=True, preserve_units=True)
-    pr2 = pyproj.Proj(projection2, errcheck=True, preserve_units=True)
 
 
-    df[xcoltrans], df[ycoltrans] = pyproj.transform(pr1, pr2, df[xcolin].tolist(), df[ycolin].tolist())
 
+def _reproject_batch(geoms, projection1, projection2):
+    """Reproject a batch of GeoJSON geometry mappings (for reproject_shp)."""
+    return _transform_mappings(geoms, get_transformer(projection1, projection2))
 
 
+def reproject_shp(inshp, outshp, projection2, projection1=None,
+                  batch_size=10000, processes=None, layer=None, driver=None):
+    """Reproject a shapefile (or other vector file) to a new coordinate system,
+    without reading it all into memory. Features are read in batches of batch_size,
+    the coordinates of each batch are transformed together (see projectdf),
+    and the batch is written to the output file, so that only a few batches
+    are held in memory at a time.
+
+    Parameters
+    ----------
+    inshp : str
+        Input file.
+    outshp : str
+        Output file (the format is set by the extension, or driver).
+    projection2 : str, int or dict
+        Coordinate system for the output (EPSG code, proj4 string, WKT,
+        .prj file or fiona crs dictionary; see GISio.get_crs).
+    projection1 : str, int or dict, optional
+        Coordinate system of the input, if it isn't defined in the file.
+    batch_size : int
+        Number of features to reproject at a time.
+    processes : int, optional
+        Number of processes to reproject batches in parallel
+        (by default, batches are reprojected in this process).
+    layer : str or int, optional
+        Layer to read from inshp.
+    driver : str, optional
+        OGR driver for the output (see GISio.df2shp).
+    """
+    import itertools
+
+    if os.path.split(outshp)[0] != '' and not os.path.isdir(os.path.split(outshp)[0]):
+        raise IOError("Output folder doesn't exist")
+    driver = GISio._get_driver(outshp, driver)
+    if driver == 'Parquet':
+        raise ValueError("reproject_shp doesn't support Parquet files; use shp2df, projectdf and df2shp")
+
+    print('reprojecting {} --> {}...'.format(inshp, outshp))
+    ta = time.time()
+    with fiona.open(inshp, layer=layer) as src:
+        if projection1 is None:
+            if os.path.splitext(inshp)[1].lower() == '.shp' and \
+                    os.path.exists(os.path.splitext(inshp)[0] + '.prj'):
+                projection1 = inshp
+            elif src.crs_wkt:
+                projection1 = src.crs_wkt
+            else:
+                raise ValueError('{} has no coordinate system; specify projection1'.format(inshp))
+        crs_wkt = GISio.get_crs(projection2).to_wkt()
+        features = iter(src)
+        batches = iter(lambda: list(itertools.islice(features, batch_size)), [])
+
+        length = 0
+        with fiona.open(outshp, 'w', driver=driver, schema=src.schema,
+                        crs_wkt=crs_wkt) as dest:
+
+            def write(batch, geoms):
+                dest.writerecords([{'geometry': g, 'properties': f['properties']}
+                                   for f, g in zip(batch, geoms)])
+
+            if processes is None:
+                for batch in batches:
+                    write(batch, _reproject_batch([f['geometry'] for f in batch],
+                                                  projection1, projection2))
+                    length += len(batch)
+            else:
+                # only a few batches are submitted to the pool at a time,
+                # so that the input isn't read faster than it's written
+                from multiprocessing import Pool
+                pending = collections.deque()
+                with Pool(processes) as pool:
+                    for batch in batches:
+                        pending.append((batch, pool.apply_async(
+                            _reproject_batch, ([f['geometry'] for f in batch],
+                                               projection1, projection2))))
+                        if len(pending) >= 2 * processes:
+                            batch, result = pending.popleft()
+                            write(batch, result.get())
+                            length += len(batch)
+                    while pending:
+                        batch, result = pending.popleft()
+                        write(batch, result.get())
+                        length += len(batch)
+
+    # write a prj file from the local CRS registry (see GISio.get_crs)
+    if driver == 'ESRI Shapefile':
+        GISio.write_prj(projection2, '{}.prj'.format(os.path.splitext(outshp)[0]))
+    elapsed = time.time() - ta
+    print('reprojected {} features in {:.2f}s ({:.0f} features/s)'.format(
+        length, elapsed, length / max(elapsed, 1e-6)))
+
 
 def intersect_rtree(geom1, geom2):
     """Intersect features in geom1 with those in geom2. For each feature in geom2, return a list of
@@ -456,8 +874,12 @@ def intersect_rtree(geom1, geom2):
 
     Parameters:
     ----------
-    geom1 : list or rtree spatial index object
-        list of shapely geometry objects
+    geom1 : list or str
+        list of shapely geometry objects (or GISio.LazyGeometry objects;
+        only those that are candidates for intersection are decoded),
+        or a shapefile, in which case candidates are found with its persistent
+        spatial index (see build_rtree_index), only the candidate features are read,
+        and the feature ids of the intersecting features are returned.
     geom2 : list
         list of shapely polygon objects to be intersected with features in geom1
     index :
@@ -468,20 +890,33 @@ def intersect_rtree(geom1, geom2):
     A list of the same length as geom2; containing for each feature in geom2,
     a list of indicies of intersecting geometries in geom1.
     """
-    if isinstance(geom1, list):
+    src = None
+    if isinstance(geom1, str):
         idx = build_rtree_index(geom1)
+        src = fiona.open(geom1)
+        get_geom = lambda i: shape(src[i]['geometry'])
     else:
-        idx = geom1
+        if isinstance(geom1, (list, np.ndarray, pd.Series)):
+            geom1 = list(geom1)
+            idx = build_rtree_index(geom1)
+        else:
+            idx = geom1
+        get_geom = lambda i: geom1[i]
     isfr = []
     print('\nIntersecting {} features...'.format(len(geom2)))
     ta = time.time()
-    for pind, poly in enumerate(geom2):
-        print('\r{}'.format(pind + 1), end='')
-        # test for intersection with bounding box of each polygon feature in geom2 using spatial index
-        inds = [i for i in idx.intersection(poly.bounds)]
-        # test each feature inside the bounding box for intersection with the polygon geometry
-        inds = [i for i in inds if geom1[i].intersects(poly)]
-        isfr.append(inds)
+    try:
+        for pind, poly in enumerate(geom2):
+            print('\r{}'.format(pind + 1), end='')
+            poly = _to_shapely(poly)
+            # test for intersection with bounding box of each polygon feature in geom2 using spatial index
+            inds = [int(i) for i in idx.intersection(poly.bounds)]
+            # test each feature inside the bounding box for intersection with the polygon geometry
+            inds = [i for i in inds if get_geom(i).intersects(poly)]
+            isfr.append(inds)
+    finally:
+        if src is not None:
+            src.close()
     print("\nfinished in {:.2f}s\n".format(time.time() - ta))
     return isfr
 
@@ -610,7 +1045,7 @@ def join_csv2shp(shapefile, shp_joinfield, csvfile, csv_joinfield, out_shapefile
     joined = shpdf.join(csvdf, how='inner', lsuffix='L', rsuffix='R')
 
     # write to shapefile
-    GISio.df2shp(joined, out_shapefile, 'geometry', shapefile[:-4]+'.prj')
+    GISio.df2shp(joined, out_shapefile, 'geometry', prj=shapefile[:-4]+'.prj')
 
 
 def rotate_coords(coords, rot, origin):
@@ -654,13 +1089,15 @@ def _to_geojson(features):
                 raise TypeError('Unrecognized feature type')
     return geoms
 
+def _to_shapely(geom, cache=True):
+    """Get the shapely geometry from a GISio.LazyGeometry
+    (other geometries are returned as is)."""
+    if isinstance(geom, GISio.LazyGeometry):
+        return geom.to_shapely(cache=cache)
+    return geom
+
 def _get_bounds(geojsoncollection):
-    xmin, xmax = 0, 0
-    ymin, ymax = 0, 0
-    for feature in geojsoncollection:
-        for crds in feature['coordinates']:
-            a = np.array(crds)
-            x, y = a[:, 0], a[:, 1]
-            xmin, xmax = np.min(x, xmin), np.max(x, xmax)
-            ymin, ymax = np.min(y, ymin), np.max(y, ymax)
+    """Bounds (xmin, xmax, ymin, ymax) of a collection of GeoJSON geometries
+    (of any type), computed with GISio.feature_bounds."""
+    xmin, ymin, xmax, ymax = GISio._total_bounds(GISio.feature_bounds(geojsoncollection))
     return xmin, xmax, ymin, ymax
\ No newline at end of file
@@ -8,7 +8,11 @@ Examples
 >>> image = PIL.Image.open('photo.jpg')  # load an image through PIL's Image object
 >>> exif_data = get_exif_data(image)
 >>> print(get_lat_lon(exif_data))
+
+For large numbers of photos, read_gps_info and get_gps_location only read the GPS tags
+from the file header, without decoding the image or the rest of the EXIF data.
 """
+import struct
 from PIL import Image
 from PIL.ExifTags import TAGS, GPSTAGS
 
@@ -80,3 +84,117 @@ def get_lat_lon(exif_data):
                 lon = 0 - lon
 
     return lat, lon
+
+
+# sizes of the TIFF field types (BYTE, ASCII, SHORT, LONG, RATIONAL, UNDEFINED, SLONG, SRATIONAL)
+_tiff_type_sizes = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 7: 1, 9: 4, 10: 8}
+
+
+def _read_ifd(f, base, offset, endian):
+    """Read the entries of a TIFF image file directory (IFD), as a dictionary
+    of tag: (type, count, value or offset bytes)."""
+    f.seek(base + offset)
+    n = struct.unpack(endian + 'H', f.read(2))[0]
+    entries = {}
+    for i in range(n):
+        tag, typ, count, value = struct.unpack(endian + 'HHI4s', f.read(12))
+        entries[tag] = (typ, count, value)
+    return entries
+
+
+def _ifd_value(f, base, endian, typ, count, value):
+    """Decode the value of an IFD entry."""
+    if typ not in _tiff_type_sizes:
+        return None
+    size = _tiff_type_sizes[typ] * count
+    if size > 4:
+        f.seek(base + struct.unpack(endian + 'I', value)[0])
+        data = f.read(size)
+    else:
+        data = value[:size]
+    if typ == 2:
+        return data.rstrip(b'\x00').decode('ascii', 'replace')
+    if typ in (1, 7):
+        return data
+    if typ in (5, 10):
+        fmt = 'I' if typ == 5 else 'i'
+        ints = struct.unpack(endian + fmt * 2 * count, data)
+        values = tuple(num / den if den != 0 else float('nan')
+                       for num, den in zip(ints[::2], ints[1::2]))
+    else:
+        fmt = {3: 'H', 4: 'I', 9: 'i'}[typ]
+        values = struct.unpack(endian + fmt * count, data)
+    return values[0] if count == 1 else values
+
+
+def read_gps_info(filename):
+    """Read the GPS tags of a JPEG or TIFF photo, by seeking to the GPS IFD
+    in the file header; the image and the other EXIF tags are not read.
+
+    Returns
+    -------
+    gps_info : dict
+        GPS tag names (e.g. 'GPSLatitude') and values;
+        empty if the photo doesn't have GPS tags.
+    """
+    with open(filename, 'rb') as f:
+        head = f.read(2)
+        base = None
+        if head == b'\xff\xd8':  # JPEG; find the APP1 segment with the EXIF data
+            while True:
+                marker = f.read(2)
+                if len(marker) < 2 or marker[0] != 0xFF or marker[1] in (0xD9, 0xDA):
+                    break  # end of image or start of image data
+                size = struct.unpack('>H', f.read(2))[0]
+                start = f.tell()
+                if marker[1] == 0xE1 and f.read(6) == b'Exif\x00\x00':
+                    base = f.tell()
+                    break
+                f.seek(start + size - 2)
+        elif head in (b'II', b'MM'):  # TIFF
+            base = 0
+        if base is None:
+            return {}
+
+        f.seek(base)
+        endian = '<' if f.read(2) == b'II' else '>'
+        f.read(2)
+        ifd0 = _read_ifd(f, base, struct.unpack(endian + 'I', f.read(4))[0], endian)
+        if 0x8825 not in ifd0:
+            return {}
+        typ, count, value = ifd0[0x8825]
+        gps_ifd = _read_ifd(f, base, _ifd_value(f, base, endian, typ, count, value), endian)
+        return {GPSTAGS.get(tag, tag): _ifd_value(f, base, endian, *entry)
+                for tag, entry in gps_ifd.items()}
+
+
+def get_gps_location(filename):
+    """Get the location and time of a photo from its GPS tags (see read_gps_info).
+
+    Returns
+    -------
+    lon, lat, altitude, timestamp
+        Decimal degrees, altitude (meters above sea level) and UTC time
+        ('YYYY-MM-DD HH:MM:SS'); None for values that aren't in the GPS tags.
+    """
+    gps_info = read_gps_info(filename)
+
+    def degrees(value, ref, negative):
+        if value is None or ref is None:
+            return None
+        d, m, s = value
+        degrees = d + m / 60.0 + s / 3600.0
+        return -degrees if ref == negative else degrees
+
+    lat = degrees(gps_info.get('GPSLatitude'), gps_info.get('GPSLatitudeRef'), 'S')
+    lon = degrees(gps_info.get('GPSLongitude'), gps_info.get('GPSLongitudeRef'), 'W')
+    altitude = gps_info.get('GPSAltitude')
+    if altitude is not None and gps_info.get('GPSAltitudeRef') in (b'\x01', 1):
+        altitude = -altitude
+    timestamp = None
+    if 'GPSDateStamp' in gps_info:
+        timestamp = gps_info['GPSDateStamp'].replace(':', '-')
+        if 'GPSTimeStamp' in gps_info:
+            h, m, s = gps_info['GPSTimeStamp']
+            timestamp += ' {:02d}:{:02d}:{:02d}'.format(int(h), int(m), int(s))
+    return lon, lat, altitude, timestamp
@@ -9,7 +9,7 @@ def run():
           author_email='jlawhead@geospatialpython.com',
           url='https://github.com/GeospatialPython/pyshp',
           download_url='https://github.com/GeospatialPython/pyshp/archive/1.2.10.tar.gz',
-          py_modules=['GISio', 'GISops'],
+          py_modules=['GISio', 'GISops', 'get_lat_lon_exif_pil'],
           zip_safe=False
           )
           
@@ -3,10 +3,15 @@ sys.path.insert(0, '..')
 import os
 import time
 import numpy as np
+import pytest
 import pandas as pd
-from shapely.geometry import Point
+from shapely.geometry import Point, Polygon
 from GISio import shp_properties
-from GISio import df2shp, shp2df
+from GISio import df2shp, csv2points, shpfromdf, linestring_shpfromdf, shp2df, shp2df_chunks, LazyGeometry, decode_geometries
+from GISio import SpatialIndex, load_spatial_index, get_shapefile_bounds, DataFrameCache
+from GISio import feature_bounds, get_feature_bounds, get_df_bounds, get_photo_locations
+from GISio import get_crs, get_wkt, getPRJwkt, get_proj4
+import GISio
 
 if not os.path.isdir('temp'):
     os.makedirs('temp')
@@ -65,6 +70,427 @@ def test_shp_read_and_write():
     assert 'datetime' in df.columns
     assert df.datetime[0] == '2016-01-01 01:00:00'
 
+def test_shp2df_engines():
+
+    df = pd.DataFrame({'reach': np.arange(1, 101, dtype=int), 'value': np.arange(100, dtype=float),
+                       'name': ['stuff{}'.format(i) for i in np.arange(100)],
+                       'geometry': [Point([i, i]) for i in range(100)]})
+    df.loc[5, 'value'] = np.nan
+    df2shp(df, 'temp/junk.shp')
+    df1 = shp2df('temp/junk.shp', index='reach', clipto=np.arange(10, 20))
+    df2 = shp2df('temp/junk.shp', index='reach', clipto=np.arange(10, 20), engine='pyogrio')
+    pd.testing.assert_frame_equal(df1, df2)
+    df1 = shp2df('temp/junk.dbf', filter=(0, 0, 50, 50))
+    df2 = shp2df('temp/junk.dbf', filter=(0, 0, 50, 50), engine='pyogrio')
+    assert len(df2) == 51
+    pd.testing.assert_frame_equal(df1, df2)
+
+    # fields narrower than 64 bits get the same dtypes as with fiona
+    df1 = shp2df('data/test_area.shp')
+    df2 = shp2df('data/test_area.shp', engine='pyogrio')
+    pd.testing.assert_frame_equal(df1, df2)
+
+def test_shp2df_chunks():
+
+    df = pd.DataFrame({'reach': np.arange(1, 101, dtype=int), 'value': np.arange(100, dtype=float),
+                       'isTrue': ['True', 'False'] * 50,
+                       'geometry': [Point([i, i]) for i in range(100)]})
+    df2shp(df, 'temp/junk.shp')
+    kwargs = {'index': 'reach', 'clipto': np.arange(10, 60), 'filter': (0, 0, 50, 50),
+              'true_values': 'True', 'false_values': 'False'}
+    chunks = list(shp2df_chunks('temp/junk.shp', chunksize=15, **kwargs))
+    assert [len(c) for c in chunks] == [15, 15, 12]
+    df2 = shp2df('temp/junk.shp', **kwargs)
+    pd.testing.assert_frame_equal(pd.concat(chunks), df2)
+
+def test_shp2df_columns():
+
+    df = pd.DataFrame({'reach': np.arange(1, 101, dtype=int), 'value': np.arange(100, dtype=float),
+                       'name': ['stuff{}'.format(i) for i in np.arange(100)],
+                       'geometry': [Point([i, i]) for i in range(100)]})
+    df2shp(df, 'temp/junk.shp')
+    df2 = shp2df('temp/junk.shp', columns=['VALUE'], index='reach', geometry=False)
+    assert df2.columns.tolist() == ['reach', 'value']
+    df3 = shp2df('temp/junk.shp', columns=['value'], index='reach', geometry=False,
+                 where='value >= 10 AND value < 20', engine='pyogrio')
+    pd.testing.assert_frame_equal(df2.loc[11:20], df3)
+    df4 = shp2df('temp/junk.shp', columns=['value'], index='reach', geometry=False,
+                 where='value >= 10 AND value < 20')
+    pd.testing.assert_frame_equal(df3, df4)
+    chunks = list(shp2df_chunks('temp/junk.shp', chunksize=4, index='reach',
+                                filter=(0, 0, 15, 15), where='value >= 10 AND value < 20'))
+    assert pd.concat(chunks).reach.tolist() == list(range(11, 17))
+
+def test_flatten_3Dshp():
+    from GISio import flatten_3Dshp
+
+    df = pd.DataFrame({'reach': np.arange(1, 11, dtype=int),
+                       'geometry': [Point([i, i, 1.]) for i in range(10)]})
+    df2shp(df, 'temp/junk3d.shp', epsg=26916)
+    flatten_3Dshp('temp/junk3d.shp')
+    df2 = shp2df('temp/junk3d_2D.shp')
+    assert df2.columns.tolist() == ['reach', 'geometry']
+    assert not df2.geometry[0].has_z
+    assert os.path.exists('temp/junk3d_2D.prj')
+
+def test_lazy_geometry():
+    import pickle
+    from GISops import projectdf, intersect_rtree
+
+    df = pd.DataFrame({'reach': np.arange(1, 101, dtype=int),
+                       'geometry': [Point([i, i]).buffer(0.6) for i in range(100)]})
+    df2shp(df, 'temp/junk.shp')
+    for engine in 'fiona', 'pyogrio':
+        df2 = shp2df('temp/junk.shp', lazy_geometry=True, engine=engine)
+        g = df2.geometry[0]
+        assert isinstance(g, LazyGeometry)
+        assert g.type == 'Polygon' and g._geom is None
+        assert isinstance(g.data, bytes)
+        assert np.allclose(g.bounds, df.geometry[0].bounds) and g._geom is None
+        assert np.allclose(g.area, df.geometry[0].area) and g._geom is not None
+        assert pickle.loads(pickle.dumps(g)) == g
+        decoded = decode_geometries(df2.geometry)
+        assert all(g1.equals(g2) for g1, g2 in zip(decoded, df.geometry))
+        df2shp(df2, 'temp/junk2.shp')
+        assert shp2df('temp/junk2.shp').geometry[10].equals(df.geometry[10])
+        assert intersect_rtree(df2.geometry, [Point(10, 10).buffer(1.)]) == [[9, 10, 11]]
+        projected = projectdf(df2, '+init=epsg:26916', '+init=epsg:26916')
+        assert projected[3].equals(df.geometry[3])
+    # the fiona reader keeps the GeoJSON mappings
+    chunk = next(shp2df_chunks('temp/junk.shp', lazy_geometry=True))
+    g = chunk.geometry[5]
+    assert g.data['type'] == 'Polygon' and g._geom is None
+    assert np.allclose(g.bounds, df.geometry[5].bounds) and g._geom is None
+    assert g.equals(df.geometry[5])
+    # only the intersection candidates are decoded
+    chunk = next(shp2df_chunks('temp/junk.shp', lazy_geometry=True))
+    assert intersect_rtree(chunk.geometry, [Point(10, 10).buffer(1.)]) == [[9, 10, 11]]
+    decoded = [i for i, g in enumerate(chunk.geometry) if g._geom is not None]
+    assert decoded == [9, 10, 11]
+
+def test_key_index():
+
+    df = pd.DataFrame({'site_no': ['site{}'.format(i) for i in range(100)],
+                       'value': np.arange(100, dtype=float),
+                       'geometry': [Point([i, i]) for i in range(100)]})
+    df2shp(df, 'temp/sites.shp')
+    if os.path.exists('temp/sites.site_no.idx.npz'):
+        os.remove('temp/sites.site_no.idx.npz')
+    clipto = ['site50', 'site3', 'site99', 'junk']
+    df1 = shp2df('temp/sites.shp', index='site_no', clipto=clipto)
+    for engine in 'fiona', 'pyogrio':
+        df2 = shp2df('temp/sites.shp', index='SITE_NO', clipto=clipto, key_index=True, engine=engine)
+        assert os.path.exists('temp/sites.site_no.idx.npz')
+        pd.testing.assert_frame_equal(df1, df2)
+    assert len(shp2df('temp/sites.shp', index='site_no', clipto=['junk'], key_index=True)) == 0
+    # index is rebuilt when the dbf changes
+    df2shp(df.iloc[:10], 'temp/sites.shp')
+    df2 = shp2df('temp/sites.shp', index='site_no', clipto=clipto, key_index=True)
+    assert df2.index.tolist() == ['site3']
+
+def test_spatial_index():
+
+    x, y = np.meshgrid(np.arange(100), np.arange(100))
+    bounds = np.column_stack([x.ravel(), y.ravel(), x.ravel() + 0.5, y.ravel() + 0.5])
+    idx = SpatialIndex(bounds, np.arange(len(bounds)))
+    assert idx.bounds == (0, 0, 99.5, 99.5)
+    bbox = (10.2, 20.7, 30, 31)
+    hits = (bounds[:, 0] <= 30) & (bounds[:, 2] >= 10.2) & (bounds[:, 1] <= 31) & (bounds[:, 3] >= 20.7)
+    assert np.array_equal(idx.intersection(bbox), np.where(hits)[0])
+    # the saved tree is loaded as is (memory-mapped)
+    idx.save('temp/junk_index.npz')
+    idx2 = SpatialIndex.load('temp/junk_index.npz')
+    assert isinstance(idx2.levels[0], np.memmap)
+    assert all(np.array_equal(l1, l2) for l1, l2 in zip(idx.levels, idx2.levels))
+    assert np.array_equal(idx2.intersection(bbox), np.where(hits)[0])
+
+    df = pd.DataFrame({'reach': np.arange(1, 101, dtype=int),
+                       'geometry': [Point([i, i]).buffer(0.5) for i in range(100)]})
+    df2shp(df, 'temp/junk.shp')
+    if os.path.exists('temp/junk.sidx.npz'):
+        os.remove('temp/junk.sidx.npz')
+    assert load_spatial_index('temp/junk.shp', build=False) is None
+    # (total bounds are read from the header)
+    assert np.allclose(get_shapefile_bounds('temp/junk.shp'), (-0.5, 99.5, -0.5, 99.5))
+    assert np.allclose(load_spatial_index('temp/junk.shp').bounds, (-0.5, -0.5, 99.5, 99.5))
+    assert os.path.exists('temp/junk.sidx.npz')
+    df1 = shp2df('temp/junk.shp', filter=(10, 10, 20, 20), spatial_index=False)
+    df2 = shp2df('temp/junk.shp', filter=(10, 10, 20, 20))
+    pd.testing.assert_frame_equal(df1, df2)
+    # intersections with the features of a shapefile use its spatial index
+    from GISops import build_rtree_index, intersect_rtree
+    assert isinstance(build_rtree_index('temp/junk.shp'), SpatialIndex)
+    assert intersect_rtree('temp/junk.shp', [Point(10, 10).buffer(1.)]) == [[9, 10, 11]]
+
+    # features with bounding boxes that intersect the filter,
+    # but geometries that don't, aren't read (as without the index)
+    df = pd.DataFrame({'id': [1], 'geometry': [Polygon([(0, 0), (10, 0), (0, 10)])]})
+    df2shp(df, 'temp/triangle.shp')
+    assert len(shp2df('temp/triangle.shp', filter=(8, 8, 9, 9))) == 0
+    load_spatial_index('temp/triangle.shp')
+    assert len(shp2df('temp/triangle.shp', filter=(8, 8, 9, 9))) == 0
+    assert len(shp2df('temp/triangle.shp', filter=(1, 1, 2, 2))) == 1
+    assert np.isnan(get_shapefile_bounds('temp/triangle.shp', filter=(8, 8, 9, 9))).all()
+
+def test_shp2df_cache():
+
+    df = pd.DataFrame({'reach': np.arange(1, 101, dtype=int), 'value': np.arange(100, dtype=float),
+                       'name': ['stuff{}'.format(i) for i in np.arange(100)],
+                       'geometry': [Point([i, i]) for i in range(100)]})
+    df2shp(df, 'temp/cached.shp')
+    cache = DataFrameCache('temp/cache', max_size=1e9)
+    cache.clear()
+    df1 = shp2df('temp/cached.shp', index='reach', cache=cache)
+    df2 = shp2df('temp/cached.shp', index='reach', cache=cache)
+    df3 = shp2df('temp/cached.shp', index='reach', clipto=[1, 2], cache=cache)
+    assert cache.stats['hits'] == 1 and cache.stats['misses'] == 2
+    pd.testing.assert_frame_equal(df1, df2)
+    assert len(df3) == 2
+    # files are re-read when they change
+    df2shp(df.iloc[:10], 'temp/cached.shp')
+    assert len(shp2df('temp/cached.shp', index='reach', cache=cache)) == 10
+    assert cache.stats['misses'] == 3
+    # least recently used entries are evicted
+    cache.max_size = 1
+    cache.evict()
+    assert len(os.listdir('temp/cache')) == 0
+
+def test_shp2df_multiple_files():
+
+    df1 = pd.DataFrame({'reach': np.arange(1, 11, dtype=int), 'value': np.arange(10, dtype=float),
+                        'geometry': [Point([i, i]) for i in range(10)]})
+    df2 = pd.DataFrame({'REACH': np.arange(11, 21, dtype=int), 'name': ['stuff'] * 10,
+                        'geometry': [Point([i, i]) for i in range(10, 20)]})
+    df2shp(df1, 'temp/junk1.shp')
+    df2shp(df2, 'temp/junk2.shp')
+    df = shp2df(['temp/junk1.shp', 'temp/junk2.shp'], index='reach')
+    assert df.columns.tolist() == ['reach', 'value', 'name', 'geometry']
+    assert np.array_equal(df.index.values, np.arange(1, 21))
+    assert df.value.isnull().sum() == 10
+    df3 = shp2df(['temp/junk1.shp', 'temp/junk2.shp'], index='reach', processes=2)
+    pd.testing.assert_frame_equal(df, df3)
+
+def test_df2shp_engines():
+
+    df = pd.DataFrame({'reach': np.arange(1, 11, dtype=int), 'value': np.arange(10, dtype=float),
+                       'name': ['stuff'] * 9 + [None], 'a_very_long_name': np.arange(10),
+                       'geometry': [Point([i, i]) for i in range(10)]})
+    df2shp(df, 'temp/junk_fiona.shp', epsg=4269)
+    df2shp(df, 'temp/junk_pyogrio.shp', epsg=4269, engine='pyogrio', batch_size=3)
+    df1 = shp2df('temp/junk_fiona.shp')
+    df2 = shp2df('temp/junk_pyogrio.shp')
+    assert len(df2) == 10
+    assert df2.columns.tolist() == ['reach', 'value', 'name', 'a_very_l3', 'geometry']
+    assert os.path.exists('temp/junk_pyogrio.prj')
+    for c in ['reach', 'value', 'a_very_l3']:
+        assert np.array_equal(df1[c].values, df2[c].values)
+    assert df2.name.tolist()[:9] == ['stuff'] * 9
+    assert all(g1.equals(g2) for g1, g2 in zip(df1.geometry, df2.geometry))
+    df2shp(df.drop('geometry', axis=1), 'temp/junk_pyogrio.dbf', engine='pyogrio')
+    assert len(shp2df('temp/junk_pyogrio.dbf')) == 10
+
+def test_df2shp_retain_order():
+
+    df = pd.DataFrame({'z': np.arange(3), 'b': ['a', 'b', 'c'], 'a': [1., 2, 3],
+                       'geometry': [Point([i, i]) for i in range(3)]})
+    df = df[['z', 'b', 'a', 'geometry']]
+    for engine in 'fiona', 'pyogrio':
+        df2shp(df, 'temp/junk_order.shp', retain_order=True, engine=engine)
+        df2 = shp2df('temp/junk_order.shp')
+        assert df2.columns.tolist() == ['z', 'b', 'a', 'geometry']
+        assert df2.b.tolist() == ['a', 'b', 'c']
+
+def test_shpfromdf():
+
+    from pyproj import CRS
+    with open('temp/junk_4269.prj', 'w') as dest:
+        dest.write(CRS.from_epsg(4269).to_wkt('WKT1_ESRI'))
+    df = pd.DataFrame({'X': np.arange(5, dtype=float), 'Y': np.arange(5, dtype=float) * 2,
+                       'name': list('abcde')}, index=np.arange(10, 15))
+    shpfromdf(df, 'temp/junk_points.shp', 'X', 'Y', 'temp/junk_4269.prj')
+    assert 'geometry' not in df.columns
+    df2 = shp2df('temp/junk_points.shp')
+    assert df2.name.tolist() == list('abcde')
+    assert [(g.x, g.y) for g in df2.geometry] == list(zip(df.X, df.Y))
+    assert os.path.exists('temp/junk_points.prj')
+
+    # vertices for lines 2 and 1 interleaved
+    df = pd.DataFrame({'id': [2, 1, 2, 1, 2], 'x': [0., 10, 1, 11, 2], 'y': [0., 10, 1, 11, 2],
+                       'z': [5., 6, 7, 8, 9], 'value': [1., 2, 3, 4, 5]})
+    for engine in 'fiona', 'pyogrio':
+        linestring_shpfromdf(df, 'temp/junk_lines.shp', 'id', 'x', 'y', 'z',
+                             'temp/junk_4269.prj', aggregate={'value': 'mean'}, engine=engine)
+        df2 = shp2df('temp/junk_lines.shp')
+        assert df2.id.tolist() == [1, 2]
+        assert np.allclose(df2.value, [3, 3])
+        assert list(df2.geometry[0].coords) == [(10, 10, 6), (11, 11, 8)]
+        assert list(df2.geometry[1].coords) == [(0, 0, 5), (1, 1, 7), (2, 2, 9)]
+
+def test_df2shp_append():
+
+    df = pd.DataFrame({'reach': np.arange(1, 11, dtype=int), 'value': np.arange(10, dtype=float),
+                       'name': ['stuff'] * 10,
+                       'geometry': [Point([i, i]) for i in range(10)]})
+    for engine in 'fiona', 'pyogrio':
+        if os.path.exists('temp/junk_append.shp'):
+            os.remove('temp/junk_append.shp')
+        for i in range(0, 10, 4):
+            df2shp(df.iloc[i:i + 4], 'temp/junk_append.shp', mode='a', engine=engine)
+        df2 = shp2df('temp/junk_append.shp')
+        assert df2.reach.tolist() == df.reach.tolist()
+        assert all(g1.equals(g2) for g1, g2 in zip(df.geometry, df2.geometry))
+
+        # ints can be appended to a float field, but not the other way around
+        batch = df.iloc[:2].copy()
+        batch['value'] = [1, 2]
+        df2shp(batch, 'temp/junk_append.shp', mode='a', engine=engine)
+        batch['reach'] = [1.5, 2.5]
+        with pytest.raises(ValueError):
+            df2shp(batch, 'temp/junk_append.shp', mode='a', engine=engine)
+        with pytest.raises(ValueError):
+            df2shp(df[['name', 'reach', 'value', 'geometry']], 'temp/junk_append.shp',
+                   mode='a', engine=engine)
+        assert len(shp2df('temp/junk_append.shp')) == 12
+
+    # pipeline with a chunked reader
+    os.remove('temp/junk_append.shp')
+    df2shp(df, 'temp/junk_append_source.shp', epsg=4269)
+    for chunk in shp2df_chunks('temp/junk_append_source.shp', chunksize=4):
+        df2shp(chunk, 'temp/junk_append.shp', mode='a')
+    assert len(shp2df('temp/junk_append.shp')) == 10
+
+def test_csv2points():
+
+    df = pd.DataFrame({'site': np.arange(10), 'name': list('abcdefghij'),
+                       'POINT_X': np.arange(10) * 1.5, 'POINT_Y': np.arange(10) * 2.5})
+    df.to_csv('temp/junk_points.csv', index=False)
+    csv2points('temp/junk_points.csv', shpname='temp/junk_csv.shp', prj=None)
+    df1 = shp2df('temp/junk_csv.shp')
+    for engine in 'fiona', 'pyogrio':
+        csv2points('temp/junk_points.csv', shpname='temp/junk_csv.shp', prj=None,
+                   chunksize=3, engine=engine)
+        df2 = shp2df('temp/junk_csv.shp')
+        pd.testing.assert_frame_equal(df1.drop('geometry', axis=1), df2.drop('geometry', axis=1))
+        assert [(g.x, g.y) for g in df2.geometry] == list(zip(df.POINT_X, df.POINT_Y))
+
+def test_df2shp_formats():
+
+    df = pd.DataFrame({'reach': np.arange(1, 11, dtype=int), 'value': np.arange(10, dtype=float),
+                       'name': ['stuff'] * 9 + [None], 'a_very_long_name': np.arange(10),
+                       'flag': [True, False] * 5,
+                       'geometry': [Point([i, i]) for i in range(10)]})
+    for ext in 'gpkg', 'fgb', 'parquet':
+        for engine in 'fiona', 'pyogrio':
+            outfile = 'temp/junk_formats.{}'.format(ext)
+            df2shp(df, outfile, epsg=4269, engine=engine, batch_size=4)
+            # (FlatGeobuf features are sorted by the spatial index)
+            df2 = shp2df(outfile, engine=engine).sort_values('reach')
+            assert df2.columns.tolist() == df.columns.tolist()
+            assert df2.reach.tolist() == df.reach.tolist()
+            assert all(g1.equals(g2) for g1, g2 in zip(df.geometry, df2.geometry))
+            if ext == 'parquet' or engine == 'pyogrio':
+                assert df2.flag.dtype == bool
+            # bounding box reads use the native spatial index (or bbox column)
+            df3 = shp2df(outfile, filter=(1.5, 1.5, 4.5, 4.5), engine=engine)
+            assert sorted(df3.reach.tolist()) == [3, 4, 5]
+    df2 = shp2df('temp/junk_formats.parquet', columns=['value'], index='reach', lazy_geometry=True)
+    assert df2.columns.tolist() == ['value', 'reach', 'geometry']
+    assert isinstance(df2.geometry.iloc[0], LazyGeometry)
+    # a column with only nulls in the first row group
+    df['comment'] = [None] * 4 + ['note'] * 6
+    df2shp(df, 'temp/junk_formats.parquet', epsg=4269, batch_size=4)
+    df2 = shp2df('temp/junk_formats.parquet')
+    assert df2.comment.tolist() == df.comment.tolist()
+    df = df.drop('comment', axis=1)
+    df2shp(df.iloc[:3], 'temp/junk_formats.gpkg', mode='a', engine='pyogrio')
+    assert len(shp2df('temp/junk_formats.gpkg')) == 13
+
+def test_feature_bounds():
+
+    from shapely.geometry import Polygon, MultiPolygon, LineString, mapping
+    import GISops
+    poly = Polygon([(0, 0), (4, 0), (4, 4), (0, 4)], [[(1, 1), (2, 1), (2, 2)]])
+    multi = MultiPolygon([poly, Polygon([(10, 10), (11, 10), (11, 12)])])
+    line = LineString([(-1, 5), (3, -2)])
+    geoms = [poly, mapping(multi), LazyGeometry(line.wkb), None, mapping(Point(7, 8))]
+    bounds = feature_bounds(geoms)
+    expected = [poly.bounds, multi.bounds, line.bounds, (np.nan,) * 4, (7, 8, 7, 8)]
+    assert np.allclose(bounds, expected, equal_nan=True)
+    # lazy geometries aren't left decoded
+    assert geoms[2]._geom is None
+    lazy = LazyGeometry(mapping(poly))
+    assert np.allclose(feature_bounds([lazy]), [poly.bounds]) and lazy._geom is None
+    assert np.allclose(GISops._get_bounds([mapping(poly), mapping(multi)]), (0, 11, 0, 12))
+
+    df = pd.DataFrame({'geometry': [poly, multi, line]})
+    assert np.allclose(get_df_bounds(df), (-1, -2, 11, 12))
+    assert get_feature_bounds(df) is get_feature_bounds(df)
+    df['geometry'] = [poly, poly, poly]
+    assert np.allclose(get_df_bounds(df), poly.bounds)
+
+    df = pd.DataFrame({'reach': np.arange(10), 'geometry': [Point([i, i]) for i in range(10)]})
+    df2shp(df, 'temp/junk_bounds.shp')
+    assert np.allclose(get_shapefile_bounds('temp/junk_bounds.shp'), (0, 9, 0, 9))
+    assert np.allclose(get_shapefile_bounds('temp/junk_bounds.shp', filter=(1.5, 1.5, 4.5, 4.5)),
+                       (2, 4, 2, 4))
+
+def test_get_photo_locations():
+
+    from PIL import Image
+    from PIL.TiffImagePlugin import IFDRational
+    exif = Image.Exif()
+    exif.get_ifd(0x8825).update({1: 'N', 2: (IFDRational(43), IFDRational(4), IFDRational(3015, 100)),
+                                 3: 'W', 4: (IFDRational(89), IFDRational(24), IFDRational(13, 2)),
+                                 5: b'\x00', 6: IFDRational(2655, 10),
+                                 7: (IFDRational(14), IFDRational(3), IFDRational(25)),
+                                 29: '2016:07:04'})
+    photos = ['temp/junk_photo{}.jpg'.format(i) for i in range(3)]
+    for photo in photos[:2]:
+        Image.new('RGB', (8, 8)).save(photo, exif=exif)
+    Image.new('RGB', (8, 8)).save(photos[2])
+    if os.path.exists('temp/junk_photos.json'):
+        os.remove('temp/junk_photos.json')
+    df = get_photo_locations(photos, processes=2, cache='temp/junk_photos.json')
+    assert df.columns.tolist() == ['photo', 'lon', 'lat', 'altitude', 'datetime', 'geometry']
+    assert df.photo.tolist() == photos[:2]
+    assert np.allclose(df.lon, -(89 + 24 / 60 + 6.5 / 3600))
+    assert np.allclose(df.lat, 43 + 4 / 60 + 30.15 / 3600)
+    assert np.allclose(df.altitude, 265.5)
+    assert df.datetime.iloc[0] == pd.Timestamp('2016-07-04 14:03:25')
+    assert os.path.exists('temp/junk_photos.json')
+    df2 = get_photo_locations(photos, cache='temp/junk_photos.json', dropna=False)
+    assert len(df2) == 3 and df2.geometry.iloc[2] is None
+    pd.testing.assert_frame_equal(df, df2.iloc[:2])
+    df2shp(df, 'temp/junk_photos.shp', epsg=4326)
+
+def test_crs_registry():
+
+    crs = get_crs(4269)
+    assert get_crs('EPSG:4269') is crs
+    assert crs.to_epsg() == 4269
+    assert 'GEOGCS["GCS_North_American_1983"' in get_wkt(4269)
+    assert 'NAD83' in getPRJwkt(4269)
+
+    df = pd.DataFrame({'reach': np.arange(3), 'geometry': [Point([i, i]) for i in range(3)]})
+    df2shp(df, 'temp/junk_crs.shp', epsg=26915)
+    with open('temp/junk_crs.prj') as src:
+        assert src.read() == get_wkt(26915)
+    assert get_crs('temp/junk_crs.shp').to_epsg() == 26915
+    assert '+proj=utm +zone=15' in get_proj4('temp/junk_crs.shp')
+    info = GISio._cached_proj4.cache_info()
+    get_proj4('temp/junk_crs.prj')
+    assert GISio._cached_proj4.cache_info().hits == info.hits + 1
+
+    # prj can be an EPSG code
+    df2shp(df, 'temp/junk_crs.shp', prj='EPSG:4326')
+    assert get_crs('temp/junk_crs.shp').to_epsg() == 4326
+    df2shp(df, 'temp/junk_crs.shp', prj=26916)
+    assert get_crs('temp/junk_crs.shp').to_epsg() == 26916
+    # or a pyproj CRS
+    for engine in 'fiona', 'pyogrio':
+        df2shp(df, 'temp/junk_crs.shp', prj=get_crs(26915), engine=engine)
+        assert get_crs('temp/junk_crs.shp').to_epsg() == 26915
+
 def test_integer_dtypes():
 
     # verify that pandas is recasting numpy ints as python ints when converting to dict
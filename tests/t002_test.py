@@ -2,6 +2,7 @@ import sys
 sys.path.insert(0, '..')
 import os
 import numpy as np
+import pytest
 import matplotlib.pyplot as plt
 
 
@@ -18,6 +19,107 @@ def test_project():
     result_inva = np.array([np.squeeze(p.xy) for p in result_inv])
     assert (np.array(pointsl)- result_inva).sum() < 1e-6
 
+def test_transformer_cache():
+    from GISops import transformer_cache, projectXY
+
+    transformer_cache.clear()
+    x, y = projectXY(np.array([3e5, 4e5]), np.array([5e6, 5.1e6]), 26916, 4269)
+    x2, y2 = projectXY(np.array([3e5, 4e5]), np.array([5e6, 5.1e6]), 'EPSG:26916', 'EPSG:4269')
+    info = transformer_cache.cache_info()
+    assert info['misses'] == 1 and info['hits'] == 1 and info['size'] == 1
+    assert np.allclose(x, x2) and np.allclose(y, y2)
+    assert np.allclose(x, [-89.5431, -88.2925], atol=1e-3)
+
+def test_projectdf():
+    import pandas as pd
+    from shapely.geometry import Point, LineString, Polygon, MultiPolygon
+    from GISops import projectdf
+
+    square = [(3e5, 5e6), (3.1e5, 5e6), (3.1e5, 5.1e6), (3e5, 5.1e6)]
+    hole = [(3.01e5, 5.01e6), (3.02e5, 5.01e6), (3.02e5, 5.02e6)]
+    df = pd.DataFrame({'geometry': [Point(3e5, 5e6), Point(3e5, 5e6, 10.),
+                                    LineString(square),
+                                    Polygon(square, [hole]),
+                                    MultiPolygon([Polygon(square), Polygon(hole)]),
+                                    Polygon()]})
+    result = projectdf(df, 26916, 4269, chunksize=5)
+    expected = projectdf(df, 26916, 4269, engine='shapely')
+    for g1, g2 in zip(result, expected):
+        assert g1.geom_type == g2.geom_type
+        assert g1.wkb == g2.wkb
+
+def test_projectXY_chunks():
+    import pandas as pd
+    from GISops import projectXY, projectdf_XY, transformer_cache
+
+    x = np.linspace(3e5, 4e5, 1001)
+    y = np.linspace(5e6, 5.1e6, 1001)
+    expected = projectXY(x, y, 26916, 4269)
+    result = projectXY(x, y, 26916, 4269, chunksize=100, max_workers=4)
+    assert np.array_equal(result[0], expected[0])
+    assert np.array_equal(result[1], expected[1])
+
+    # non-contiguous output buffers
+    out = np.zeros((len(x), 2))
+    projectXY(x, y, 26916, 4269, out=(out[:, 0], out[:, 1]), chunksize=100)
+    assert np.array_equal(out[:, 1], expected[1])
+
+    df = pd.DataFrame({'x': x, 'y': y, 'name': 'pt'})
+    projectdf_XY(df, 'x', 'y', 'lon', 'lat', 26916, 4269, chunksize=100)
+    assert np.array_equal(df.lon.values, expected[0])
+    assert np.array_equal(df.lat.values, expected[1])
+
+    # short inputs use the shared transformer
+    transformer_cache.clear()
+    for i in range(3):
+        projectdf_XY(df, 'x', 'y', 'lon', 'lat', 26916, 4269)
+    assert transformer_cache.cache_info()['misses'] == 1
+    assert transformer_cache.cache_info()['hits'] == 2
+
+def test_reproject_shp():
+    import pandas as pd
+    from shapely.geometry import Point
+    from GISio import df2shp, shp2df
+    from GISops import reproject_shp, projectdf
+
+    x = np.linspace(3e5, 4e5, 250)
+    y = np.linspace(5e6, 5.1e6, 250)
+    df = pd.DataFrame({'id': np.arange(len(x)),
+                       'geometry': [Point(xi, yi).buffer(100) for xi, yi in zip(x, y)]})
+    df2shp(df, 'temp/buffers.shp', epsg=26916)
+    expected = projectdf(df, 26916, 4269)
+
+    for processes in None, 2:
+        reproject_shp('temp/buffers.shp', 'temp/buffers_4269.shp', 4269,
+                      batch_size=40, processes=processes)
+        result = shp2df('temp/buffers_4269.shp')
+        assert result.id.tolist() == df.id.tolist()
+        for g1, g2 in zip(result.geometry, expected):
+            assert np.allclose(g1.exterior.coords, g2.exterior.coords, rtol=0, atol=1e-9)
+    assert 'North_American_1983' in open('temp/buffers_4269.prj').read()
+
+    # without a .prj file, the input coordinate system must be specified
+    os.remove('temp/buffers.prj')
+    with pytest.raises(ValueError):
+        reproject_shp('temp/buffers.shp', 'temp/buffers_4269.shp', 4269)
+    reproject_shp('temp/buffers.shp', 'temp/buffers_4269.shp', 4269, projection1=26916)
+    assert len(shp2df('temp/buffers_4269.shp')) == len(df)
+
+def test_join_csv2shp():
+    import pandas as pd
+    from shapely.geometry import Point
+    from GISio import df2shp, shp2df
+    from GISops import join_csv2shp
+
+    df = pd.DataFrame({'site': np.arange(10), 'geometry': [Point(i, i) for i in range(10)]})
+    df2shp(df, 'temp/join_sites.shp', epsg=26916)
+    pd.DataFrame({'site': [2, 3], 'value': [1.5, 2.5]}).to_csv('temp/sites.csv', index=False)
+    join_csv2shp('temp/join_sites.shp', 'site', 'temp/sites.csv', 'site', 'temp/sites_joined.shp')
+    joined = shp2df('temp/sites_joined.shp')
+    assert joined.columns.tolist() == ['site', 'value', 'geometry']
+    assert joined.value.tolist() == [1.5, 2.5]
+    assert os.path.exists('temp/sites_joined.prj')
+
 def test_contour2shp():
     from GISops import contour2shp
 
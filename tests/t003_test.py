@@ -8,7 +8,8 @@ import numpy as np
 import fiona
 from shapely.geometry import mapping, shape, box
 from GISops import clip_raster
-from GISio import get_values_at_points
+from GISio import get_values_at_points, sample_raster_stack, read_raster
+from GISio import arc_ascii, read_arc_ascii
 
 #inraster = 'D:/ATLData/USFS/GreatDivide/dem/dem_utm_ft'
 inraster = 'data/dem.tif'
@@ -38,6 +39,123 @@ def test_get_values_at_points():
     for v1, v2 in zip(vals, vals2):
         assert np.abs(v1 - v2) < 0.01
 
+def test_get_values_at_points_blocks():
+    import rasterio
+    with rasterio.open('data/dem.tif') as src:
+        data = src.read(1)
+        xul, dx, _, yul, _, dy = src.transform.to_gdal()
+    # valid pixels in different blocks
+    valid_rows, valid_cols = np.where(data > -1e20)
+    rows, cols = valid_rows[::5000], valid_cols[::5000]
+    n = len(rows)
+    # pixel centers, plus a no-data pixel and a point outside of the raster
+    x = np.append(xul + (cols + 0.5) * dx, [xul + 0.5 * dx, xul - 10])
+    y = np.append(yul + (rows + 0.5) * dy, [yul + 0.5 * dy, yul])
+    assert data[0, 0] < -1e20
+    vals = get_values_at_points('data/dem.tif', x=x, y=y)
+    assert vals.dtype == np.float32
+    assert np.allclose(vals[:n], data[rows, cols])
+    assert np.isnan(vals[n:]).all()
+    masked = get_values_at_points('data/dem.tif', x=x, y=y, masked=True)
+    assert masked.dtype == np.float32
+    assert masked.mask.tolist() == [False] * n + [True, True]
+
+    # bilinear interpolation is exact at pixel centers, and halfway between them
+    # (away from no-data pixels)
+    rows, cols = np.array([100, 200, 300]), np.array([100, 200, 300])
+    x = xul + (cols + 0.5) * dx
+    y = yul + (rows + 0.5) * dy
+    vals = get_values_at_points('data/dem.tif', x=x, y=y, method='bilinear')
+    assert np.allclose(vals, data[rows, cols], rtol=1e-6)
+    vals = get_values_at_points('data/dem.tif', x=x + 0.5 * dx, y=y, method='bilinear')
+    expected = (data[rows, cols].astype(float) + data[rows, cols + 1]) / 2
+    assert np.allclose(vals, expected, rtol=1e-6)
+
+def test_sample_raster_stack():
+    import rasterio
+    # second raster on a different (coarser) grid
+    with rasterio.open('data/dem.tif') as src:
+        profile = src.profile
+        data = src.read(1)
+    xul, dx, _, yul, _, dy = profile['transform'].to_gdal()
+    profile.update(transform=rasterio.Affine.from_gdal(xul, 2 * dx, 0, yul, 0, 2 * dy),
+                   width=profile['width'] // 2, height=profile['height'] // 2)
+    with rasterio.open(outpath + 'coarse.tif', 'w', **profile) as dst:
+        dst.write(data[::2, ::2][:profile['height'], :profile['width']], 1)
+    rasters = ['data/dem.tif', outpath + 'coarse.tif', 'data/dem.tif']
+    points = [(627794.58, 5185709.21), (629230.86, 5184331.56), (0, 0)]
+    df = sample_raster_stack(rasters, points=points, names=['a', 'b', 'c'], max_workers=2)
+    assert df.shape == (3, 3)
+    assert df.columns.tolist() == ['a', 'b', 'c']
+    for name, raster in zip(df.columns, rasters):
+        expected = get_values_at_points(raster, points=points)
+        np.testing.assert_array_equal(df[name].values, expected)
+    assert df.iloc[2].isnull().all()
+    values = sample_raster_stack(rasters, points=points, method='bilinear', as_dataframe=False)
+    assert np.allclose(values[:, 0],
+                       get_values_at_points(rasters[0], points=points, method='bilinear'),
+                       equal_nan=True)
+
+def test_read_raster_lazy():
+    data, gt, proj, xy = read_raster('data/dem.tif')
+    with read_raster('data/dem.tif', lazy=True) as rst:
+        assert rst.shape == data.shape
+        assert np.allclose(rst.geotransform, gt)
+        # (np.mgrid with float steps can add or drop a row or column)
+        assert np.allclose(rst.x[:100], xy[0][:100, 0])
+        assert np.allclose(rst.y[:100], xy[1][0, :100])
+        window = rst[100:110, 50:60:2]
+        assert isinstance(window, np.ma.MaskedArray)
+        assert np.array_equal(window, data[100:110, 50:60:2])
+        assert rst[100, 50] == data[100, 50]
+        full = rst.read(masked=True)
+        assert np.array_equal(full.mask, rst.read() == rst.nodata)
+        assert np.array_equal(full.filled(0), data)
+        mm = rst.memmap()
+        assert np.array_equal(mm, rst.read())
+
+def test_read_raster_multiband():
+    import rasterio
+    from rasterio import Affine
+
+    data = np.arange(2 * 4 * 5, dtype=np.float32).reshape(2, 4, 5)
+    with rasterio.open(outpath + 'twobands.tif', 'w', driver='GTiff', height=4, width=5,
+                       count=2, dtype='float32',
+                       transform=Affine.from_gdal(0., 1., 0., 4., 0., -1.)) as dest:
+        dest.write(data)
+    # all bands are read by default
+    assert np.array_equal(read_raster(outpath + 'twobands.tif')[0], data)
+    assert np.array_equal(read_raster(outpath + 'twobands.tif', band=2)[0], data[1])
+
+def test_arc_ascii():
+    data = np.arange(35, dtype=float).reshape(5, 7) / 3
+    data[2, 3] = np.nan
+    arc_ascii(data, outpath + 'junk.asc', xll=10, yll=20, cellsize=2., chunksize=2)
+    arr, info = read_arc_ascii(outpath + 'junk.asc', chunksize=16)
+    assert info['ncols'] == 7 and info['nrows'] == 5
+    assert info['xllcorner'] == 10 and info['cellsize'] == 2
+    np.testing.assert_array_equal(arr, data)
+    np.testing.assert_array_equal(read_arc_ascii(outpath + 'junk.asc')[0], data)
+    # rows wrapped over several lines, with irregular whitespace
+    with open(outpath + 'junk.asc') as src:
+        lines = src.readlines()
+    with open(outpath + 'junk2.asc', 'w') as dest:
+        dest.writelines(lines[:6])
+        for line in lines[6:]:
+            values = line.split()
+            dest.write('\t'.join(values[:3]) + '\n  ' + '  '.join(values[3:]) + ' \n')
+    np.testing.assert_array_equal(read_arc_ascii(outpath + 'junk2.asc')[0], data)
+    # np.savetxt (used with savetxt keyword arguments) also writes the exact values
+    arc_ascii(data, outpath + 'junk.asc', newline='\n')
+    np.testing.assert_array_equal(read_arc_ascii(outpath + 'junk.asc')[0], data)
+    arc_ascii(data, outpath + 'junk.asc', fmt='%.2f')
+    np.testing.assert_allclose(read_arc_ascii(outpath + 'junk.asc')[0], data, atol=0.005)
+
+    # read into a memory-mapped .npy file
+    arr, info = read_arc_ascii(outpath + 'junk.asc', out=outpath + 'junk.npy', dtype=np.float32)
+    assert isinstance(arr, np.memmap)
+    np.testing.assert_allclose(np.load(outpath + 'junk.npy'), data, atol=0.005)
+
 if __name__ == '__main__':
     test_clip()
     test_get_values_at_points()